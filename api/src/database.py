@@ -4,9 +4,11 @@ Database configuration and session management
 
 import os
 from typing import AsyncGenerator
+from uuid import uuid4
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool
 
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
@@ -19,12 +21,52 @@ if DATABASE_URL.startswith("postgres://"):
 elif DATABASE_URL.startswith("postgresql://"):
     DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
 
+# Pool sizing. Behind PgBouncer (transaction pooling) set DB_USE_PGBOUNCER=1:
+# PgBouncer owns the pooling, and prepared statements can't survive across
+# its server connections
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_USE_PGBOUNCER = os.getenv("DB_USE_PGBOUNCER", "").lower() in ("1", "true", "yes")
+# Compiled-SQL cache entries per engine (SQLAlchemy default 500); every
+# statement shape the routes build reuses its compiled form once cached
+DB_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+# SQL statement logging; formats and writes every statement, so off by default
+DB_ECHO = os.getenv("DB_ECHO", "").lower() in ("1", "true", "yes")
+
+if DB_USE_PGBOUNCER:
+    pool_args = {
+        "poolclass": NullPool,
+        "connect_args": {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            # asyncpg still prepares each statement under a per-connection
+            # counter name, which collides once PgBouncer hands the server
+            # connection to another client; unique names avoid that
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        },
+    }
+else:
+    pool_args = {
+        "pool_pre_ping": True,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        # Fail fast instead of queueing requests for the 30s default
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        # Keep prepared statements for the hot INSERT/SELECT paths across requests
+        "connect_args": {
+            "statement_cache_size": 1024,
+            "prepared_statement_cache_size": 1024,
+        },
+    }
+
 engine = create_async_engine(
     DATABASE_URL,
-    echo=True,  # Set to False in production
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    echo=DB_ECHO,
+    query_cache_size=DB_QUERY_CACHE_SIZE,
+    **pool_args,
 )
 
 async_session_maker = async_sessionmaker(
@@ -41,6 +83,11 @@ class Base(DeclarativeBase):
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Request-scoped session. A session is not safe for concurrent use, so
+    endpoints that fan out with asyncio.gather open sibling sessions from
+    async_session_maker instead (they share this engine's pool).
+    """
     async with async_session_maker() as session:
         try:
             yield session
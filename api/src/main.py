@@ -3,19 +3,22 @@ MeterScience API
 FastAPI backend for citizen science meter reading platform
 """
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime
 from typing import Optional
 
 from fastapi import FastAPI, Depends, HTTPException, status, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 import uvicorn
 
-from .database import engine, get_db, Base
+from .database import engine, get_db, Base, async_session_maker
 from .routes import readings, users, meters, campaigns, verify, stats, webhooks
 from .services.auth import verify_token, get_current_user
+from .services import cache, http, leaderboard, materialized_views
 from .models import User
 
 # Create tables
@@ -24,8 +27,18 @@ async def lifespan(app: FastAPI):
     # Startup
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await materialized_views.ensure_materialized_views()
+    async with async_session_maker() as session:
+        await leaderboard.backfill(session)
+    refresh_task = asyncio.create_task(materialized_views.refresh_loop())
     yield
     # Shutdown
+    # Let an in-flight refresh unwind before the pool is disposed
+    refresh_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await refresh_task
+    await cache.close()
+    await http.close()
     await engine.dispose()
 
 # Initialize app
@@ -34,6 +47,7 @@ app = FastAPI(
     description="Citizen science platform for crowdsourced utility meter reading",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
 )
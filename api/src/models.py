@@ -7,8 +7,8 @@ from typing import Optional, List
 from uuid import uuid4
 
 from sqlalchemy import (
-    String, Integer, Float, Boolean, DateTime, Text, ForeignKey,
-    JSON, Index, UniqueConstraint
+    String, Integer, Float, Boolean, Date, DateTime, Text, ForeignKey,
+    JSON, Index, UniqueConstraint, table, column, text
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -17,6 +17,10 @@ from geoalchemy2 import Geography
 from .database import Base
 
 
+# Columns returned by the users leaderboard (covered by its indexes)
+LEADERBOARD_COLUMNS = ["display_name", "avatar_emoji", "level", "streak_days", "trust_score"]
+
+
 class User(Base):
     __tablename__ = "users"
     
@@ -37,6 +41,10 @@ class User(Base):
     trust_score: Mapped[int] = mapped_column(Integer, default=50)
     badges: Mapped[dict] = mapped_column(JSONB, default=list)
     
+    # Denormalized stats (kept in step by the meter/reading write paths)
+    meters_count: Mapped[int] = mapped_column(Integer, default=0)
+    average_confidence: Mapped[float] = mapped_column(Float, default=0.0)
+    
     # Subscription
     subscription_tier: Mapped[str] = mapped_column(String(20), default="free")
     subscription_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -59,6 +67,19 @@ class User(Base):
     # Relationships
     meters: Mapped[List["Meter"]] = relationship("Meter", back_populates="user", cascade="all, delete-orphan")
     readings: Mapped[List["Reading"]] = relationship("Reading", back_populates="user")
+    
+    __table_args__ = (
+        # Leaderboard: index-only top-N by readings, globally and per postal prefix
+        Index(
+            "idx_users_total_readings", text("total_readings DESC"), text("id DESC"),
+            postgresql_include=LEADERBOARD_COLUMNS,
+        ),
+        Index(
+            "idx_users_postal3_readings",
+            text("left(postal_code, 3)"), text("total_readings DESC"), text("id DESC"),
+            postgresql_include=LEADERBOARD_COLUMNS,
+        ),
+    )
 
 
 class Meter(Base):
@@ -100,6 +121,15 @@ class Meter(Base):
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="meters")
     readings: Mapped[List["Reading"]] = relationship("Reading", back_populates="meter", cascade="all, delete-orphan")
+    
+    # Indexes
+    __table_args__ = (
+        # Neighborhood lookups: postal prefix LIKE 'abc%' + meter type
+        Index(
+            "idx_meters_postal_type", "postal_code", "meter_type",
+            postgresql_ops={"postal_code": "text_pattern_ops"},
+        ),
+    )
 
 
 class Reading(Base):
@@ -139,6 +169,11 @@ class Reading(Base):
     # Verification
     verification_status: Mapped[str] = mapped_column(String(20), default="pending")
     verification_score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # Denormalized vote tallies (kept in step by vote_on_reading)
+    votes_total: Mapped[int] = mapped_column(Integer, default=0)
+    votes_correct: Mapped[int] = mapped_column(Integer, default=0)
+    votes_incorrect: Mapped[int] = mapped_column(Integer, default=0)
+    votes_unclear: Mapped[int] = mapped_column(Integer, default=0)
     flagged_for_review: Mapped[bool] = mapped_column(Boolean, default=False)
     flag_reason: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     
@@ -163,8 +198,27 @@ class Reading(Base):
         Index("idx_readings_user_id", "user_id"),
         Index("idx_readings_captured_at", "captured_at"),
         Index("idx_readings_verification_status", "verification_status"),
+        # Covering indexes for the time-range stats queries
+        Index(
+            "idx_readings_user_time", "user_id", "captured_at",
+            postgresql_include=["confidence"],
+        ),
+        Index(
+            "idx_readings_meter_time_usage", "meter_id", "captured_at",
+            postgresql_include=["usage_since_last"],
+            postgresql_where=text("usage_since_last > 0"),
+        ),
+        # Verification queue: pending readings by votes so far, then confidence
+        Index(
+            "idx_readings_pending_queue",
+            text("votes_total DESC"), text("confidence DESC"), text("id DESC"),
+            postgresql_where=text("verification_status = 'pending'"),
+        ),
     )
 
+    # Populate defaults from INSERT ... RETURNING so callers don't need a refresh
+    __mapper_args__ = {"eager_defaults": True}
+
 
 class VerificationVote(Base):
     __tablename__ = "verification_votes"
@@ -184,6 +238,16 @@ class VerificationVote(Base):
     
     __table_args__ = (
         UniqueConstraint("reading_id", "verifier_id", name="unique_vote_per_user"),
+        # Per-verifier history and period counts, index-only for the consensus join
+        Index(
+            "idx_verification_votes_verifier_created", "verifier_id", text("created_at DESC"),
+            postgresql_include=["reading_id", "vote"],
+        ),
+        # Per-reading tallies (status endpoint, finalization) without heap reads
+        Index(
+            "idx_verification_votes_reading_vote", "reading_id", "vote",
+            postgresql_include=["verifier_trust_score"],
+        ),
     )
 
 
@@ -319,3 +383,15 @@ class Webhook(Base):
     last_success_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+# Materialized views (created by services.materialized_views; not part of
+# Base.metadata, so create_all never tries to create them as tables)
+mv_reading_daily = table(
+    "mv_reading_daily",
+    column("meter_id", UUID(as_uuid=True)),
+    column("meter_type", String(20)),
+    column("day", Date),
+    column("usage", Float),
+    column("usage_readings", Integer),
+)
@@ -11,12 +11,13 @@ import secrets
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel, Field
-from sqlalchemy import select, and_, or_, func, String
+from sqlalchemy import select, update, delete, and_, or_, func, String
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
 from ..models import Campaign, CampaignParticipant, User, Reading, Meter
 from ..services.auth import get_current_user
+from ..services.cache import invalidate_users
 
 router = APIRouter()
 
@@ -461,27 +462,28 @@ async def get_campaign(
 ):
     """Get campaign details"""
 
+    # Campaign and the caller's participation in one round-trip
     result = await db.execute(
-        select(Campaign).where(Campaign.id == campaign_id)
+        select(Campaign, CampaignParticipant.id.label("participant_id"))
+        .outerjoin(
+            CampaignParticipant,
+            and_(
+                CampaignParticipant.campaign_id == Campaign.id,
+                CampaignParticipant.user_id == current_user.id
+            )
+        )
+        .where(Campaign.id == campaign_id)
     )
-    campaign = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if not campaign:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Campaign not found"
         )
 
-    # Check if user is participant
-    participation = await db.execute(
-        select(CampaignParticipant).where(
-            and_(
-                CampaignParticipant.campaign_id == campaign_id,
-                CampaignParticipant.user_id == current_user.id
-            )
-        )
-    )
-    is_participant = participation.scalar_one_or_none() is not None
+    campaign = row.Campaign
+    is_participant = row.participant_id is not None
 
     # Private campaigns require participation or organizer status
     if not campaign.is_public and not is_participant and campaign.organizer_id != current_user.id:
@@ -614,11 +616,6 @@ async def delete_campaign(
         )
 
     # Delete all participants first
-    await db.execute(
-        select(CampaignParticipant).where(CampaignParticipant.campaign_id == campaign_id)
-    )
-
-    from sqlalchemy import delete
     await db.execute(
         delete(CampaignParticipant).where(CampaignParticipant.campaign_id == campaign_id)
     )
@@ -676,7 +673,7 @@ async def join_campaign(
 
     # Check if already participating
     existing = await db.execute(
-        select(CampaignParticipant).where(
+        select(CampaignParticipant.id).where(
             and_(
                 CampaignParticipant.campaign_id == campaign_id,
                 CampaignParticipant.user_id == current_user.id
@@ -700,10 +697,13 @@ async def join_campaign(
     campaign.participant_count += 1
 
     # Award XP for joining
-    current_user.xp += 5
+    await db.execute(
+        update(User).where(User.id == current_user.id).values(xp=User.xp + 5)
+    )
 
     await db.commit()
     await db.refresh(participant)
+    await invalidate_users(current_user.id)
 
     return ParticipantResponse(
         id=participant.id,
@@ -796,7 +796,7 @@ async def get_campaign_participants(
     # Check access for private campaigns
     if not campaign.is_public and campaign.organizer_id != current_user.id:
         participation = await db.execute(
-            select(CampaignParticipant).where(
+            select(CampaignParticipant.id).where(
                 and_(
                     CampaignParticipant.campaign_id == campaign_id,
                     CampaignParticipant.user_id == current_user.id
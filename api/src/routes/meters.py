@@ -8,12 +8,16 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import select, update, func, case
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
-from ..models import Meter, User
+from ..models import Meter, User, Reading
+from ..services import leaderboard
 from ..services.auth import get_current_user
+from ..services.cache import (
+    cache_delete, invalidate_users, reading_cache_key, latest_reading_cache_key,
+)
 
 router = APIRouter()
 
@@ -134,8 +138,14 @@ async def create_meter(
     )
 
     db.add(meter)
+    await db.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(meters_count=User.meters_count + 1)
+    )
     await db.commit()
     await db.refresh(meter)
+    await invalidate_users(current_user.id)
 
     return meter
 
@@ -230,8 +240,46 @@ async def delete_meter(
             detail="Meter not found"
         )
 
+    # Readings are removed with the meter; keep the owner's counter in step
+    # and collect their ids to drop the cached copies
+    removed = (
+        await db.execute(
+            select(
+                func.count(Reading.id).label("count"),
+                func.sum(Reading.confidence).label("confidence_sum"),
+                func.array_agg(Reading.id).label("ids"),
+            ).where(Reading.meter_id == meter_id)
+        )
+    ).one()
+    readings_count = removed.count or 0
+    confidence_sum = removed.confidence_sum or 0.0
+
     await db.delete(meter)
+    user_total = await db.scalar(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(
+            meters_count=User.meters_count - 1,
+            total_readings=User.total_readings - readings_count,
+            average_confidence=case(
+                (
+                    User.total_readings > readings_count,
+                    (User.average_confidence * User.total_readings - confidence_sum)
+                    / (User.total_readings - readings_count),
+                ),
+                else_=0.0,
+            ),
+        )
+        .returning(User.total_readings)
+    )
     await db.commit()
+    await invalidate_users(current_user.id)
+    await cache_delete(
+        latest_reading_cache_key(meter_id, current_user.id),
+        *(reading_cache_key(reading_id) for reading_id in removed.ids or ()),
+    )
+    if readings_count:
+        await leaderboard.record_total_readings(current_user.id, user_total)
 
     return None
 
@@ -3,17 +3,24 @@ Readings API endpoints
 """
 
 from datetime import datetime, timezone
-from typing import Optional, List
+from typing import Any, Optional, List, AsyncIterator
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, insert, update, and_, case, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
-from ..database import get_db
+from ..database import get_db, async_session_maker
 from ..models import Reading, Meter, User, VerificationVote
+from ..services import leaderboard
 from ..services.auth import get_current_user
+from ..services.cache import (
+    cache_get, cache_set, cache_delete, invalidate_users, reading_cache_key,
+    latest_reading_cache_key,
+)
 
 router = APIRouter()
 
@@ -25,12 +32,12 @@ class ReadingCreate(BaseModel):
     normalized_value: str
     numeric_value: Optional[float] = None
     confidence: float
-    all_candidates: Optional[List[dict]] = None
+    all_candidates: Optional[Any] = None  # stored as-is in JSONB, not validated
     processing_ms: Optional[int] = None
     image_hash: Optional[str] = None
     image_brightness: Optional[float] = None
     image_blur: Optional[float] = None
-    bounding_box: Optional[dict] = None
+    bounding_box: Optional[Any] = None
     device_model: Optional[str] = None
     os_version: Optional[str] = None
     app_version: Optional[str] = None
@@ -61,6 +68,53 @@ class ReadingListResponse(BaseModel):
     total: int
     page: int
     per_page: int
+    has_more: bool
+
+
+def _confidence_avg_with(confidence: float):
+    """SQL for User.average_confidence after adding one reading"""
+    return (
+        (User.average_confidence * User.total_readings + confidence)
+        / (User.total_readings + 1)
+    )
+
+
+def _confidence_avg_without(confidence: float):
+    """SQL for User.average_confidence after removing one reading"""
+    return case(
+        (
+            User.total_readings > 1,
+            (User.average_confidence * User.total_readings - confidence)
+            / (User.total_readings - 1),
+        ),
+        else_=0.0,
+    )
+
+
+def _filtered_readings_query(
+    user_id: UUID,
+    meter_id: Optional[UUID],
+    from_date: Optional[datetime],
+    to_date: Optional[datetime],
+    verification_status: Optional[str],
+):
+    """Build the readings query shared by the list and export endpoints"""
+    query = (
+        select(Reading)
+        .options(raiseload("*"))
+        .where(Reading.user_id == user_id)
+    )
+    
+    if meter_id:
+        query = query.where(Reading.meter_id == meter_id)
+    if from_date:
+        query = query.where(Reading.captured_at >= from_date)
+    if to_date:
+        query = query.where(Reading.captured_at <= to_date)
+    if verification_status:
+        query = query.where(Reading.verification_status == verification_status)
+    
+    return query
 
 
 @router.post("/", response_model=ReadingResponse, status_code=status.HTTP_201_CREATED)
@@ -73,9 +127,9 @@ async def create_reading(
     
     # Verify meter belongs to user
     meter_query = await db.execute(
-        select(Meter).where(
-            and_(Meter.id == reading.meter_id, Meter.user_id == current_user.id)
-        )
+        select(Meter)
+        .options(raiseload("*"))
+        .where(and_(Meter.id == reading.meter_id, Meter.user_id == current_user.id))
     )
     meter = meter_query.scalar_one_or_none()
     
@@ -88,6 +142,7 @@ async def create_reading(
     # Get previous reading for usage calculation
     prev_query = await db.execute(
         select(Reading)
+        .options(raiseload("*"))
         .where(Reading.meter_id == reading.meter_id)
         .order_by(Reading.captured_at.desc())
         .limit(1)
@@ -101,8 +156,9 @@ async def create_reading(
     flag_reason = None
     
     if prev_reading and reading.numeric_value and prev_reading.numeric_value:
+        now = datetime.now(timezone.utc)
         usage_since_last = reading.numeric_value - prev_reading.numeric_value
-        days_since_last = (datetime.now(timezone.utc) - prev_reading.captured_at).total_seconds() / 86400
+        days_since_last = (now - prev_reading.captured_at).total_seconds() / 86400
         
         # Flag anomalies
         if usage_since_last < 0:
@@ -112,52 +168,66 @@ async def create_reading(
             daily_usage = usage_since_last / days_since_last
             # TODO: Compare to historical average
     
-    # Create reading
-    new_reading = Reading(
-        meter_id=reading.meter_id,
-        user_id=current_user.id,
-        raw_value=reading.raw_value,
-        normalized_value=reading.normalized_value,
-        numeric_value=reading.numeric_value,
-        confidence=reading.confidence,
-        all_candidates=reading.all_candidates,
-        processing_ms=reading.processing_ms,
-        image_hash=reading.image_hash,
-        image_brightness=reading.image_brightness,
-        image_blur=reading.image_blur,
-        bounding_box=reading.bounding_box,
-        device_model=reading.device_model,
-        os_version=reading.os_version,
-        app_version=reading.app_version,
-        capture_method=reading.capture_method,
-        timezone_offset=reading.timezone_offset,
-        usage_since_last=usage_since_last,
-        days_since_last=days_since_last,
-        flagged_for_review=flagged,
-        flag_reason=flag_reason,
+    # Create reading (single INSERT ... RETURNING with a fixed column set so
+    # asyncpg can reuse the prepared statement)
+    new_reading = await db.scalar(
+        insert(Reading).values(
+            meter_id=reading.meter_id,
+            user_id=current_user.id,
+            raw_value=reading.raw_value,
+            normalized_value=reading.normalized_value,
+            numeric_value=reading.numeric_value,
+            confidence=reading.confidence,
+            all_candidates=reading.all_candidates,
+            processing_ms=reading.processing_ms,
+            image_hash=reading.image_hash,
+            image_brightness=reading.image_brightness,
+            image_blur=reading.image_blur,
+            bounding_box=reading.bounding_box,
+            device_model=reading.device_model,
+            os_version=reading.os_version,
+            app_version=reading.app_version,
+            capture_method=reading.capture_method,
+            timezone_offset=reading.timezone_offset,
+            usage_since_last=usage_since_last,
+            days_since_last=days_since_last,
+            flagged_for_review=flagged,
+            flag_reason=flag_reason,
+        ).returning(Reading)
     )
     
-    db.add(new_reading)
-    
-    # Update user stats
-    current_user.total_readings += 1
-    current_user.xp += 10  # XP for reading
-    current_user.last_reading_date = datetime.now(timezone.utc)
+    # Update user stats (atomic increments, no read-modify-write)
+    user_total = await db.scalar(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(
+            total_readings=User.total_readings + 1,
+            xp=User.xp + 10,  # XP for reading
+            last_reading_date=func.now(),
+            average_confidence=_confidence_avg_with(reading.confidence),
+        )
+        .returning(User.total_readings)
+    )
     
     # Update streak
     # TODO: Implement streak logic
     
     # Update meter
-    meter.last_read_at = datetime.now(timezone.utc)
+    meter_values = {"last_read_at": func.now()}
     if reading.normalized_value:
-        samples = meter.sample_readings or []
+        samples = list(meter.sample_readings or [])
         samples.append(reading.normalized_value)
         if len(samples) > 50:
             samples = samples[-50:]
-        meter.sample_readings = samples
+        meter_values["sample_readings"] = samples
+    await db.execute(
+        update(Meter).where(Meter.id == meter.id).values(**meter_values)
+    )
     
     await db.commit()
-    await db.refresh(new_reading)
+    await cache_delete(latest_reading_cache_key(reading.meter_id, current_user.id))
+    await invalidate_users(current_user.id)
+    await leaderboard.record_total_readings(current_user.id, user_total)
     
     return new_reading
 
@@ -175,20 +245,17 @@ async def list_readings(
 ):
     """List readings for the current user"""
     
-    query = select(Reading).where(Reading.user_id == current_user.id)
-    
-    if meter_id:
-        query = query.where(Reading.meter_id == meter_id)
-    if from_date:
-        query = query.where(Reading.captured_at >= from_date)
-    if to_date:
-        query = query.where(Reading.captured_at <= to_date)
-    if verification_status:
-        query = query.where(Reading.verification_status == verification_status)
+    query = _filtered_readings_query(
+        current_user.id, meter_id, from_date, to_date, verification_status
+    )
     
-    # Count total
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar()
+    # Count total. Unfiltered lists use the counter kept on the user row
+    # instead of counting the user's whole history on every page.
+    if meter_id or from_date or to_date or verification_status:
+        count_query = select(func.count()).select_from(query.subquery())
+        total = (await db.execute(count_query)).scalar()
+    else:
+        total = current_user.total_readings
     
     # Paginate
     query = query.order_by(Reading.captured_at.desc())
@@ -201,10 +268,36 @@ async def list_readings(
         readings=readings,
         total=total,
         page=page,
-        per_page=per_page
+        per_page=per_page,
+        has_more=len(readings) == per_page
     )
 
 
+@router.get("/export")
+async def export_readings(
+    meter_id: Optional[UUID] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    verification_status: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Stream all matching readings as newline-delimited JSON"""
+    
+    query = _filtered_readings_query(
+        current_user.id, meter_id, from_date, to_date, verification_status
+    ).order_by(Reading.captured_at.desc())
+    
+    async def generate() -> AsyncIterator[str]:
+        # The request-scoped session is closed before the body is streamed,
+        # so the server-side cursor needs a session of its own.
+        async with async_session_maker() as session:
+            result = await session.stream_scalars(query.execution_options(yield_per=500))
+            async for reading in result:
+                yield ReadingResponse.model_validate(reading).model_dump_json() + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.get("/latest", response_model=ReadingResponse)
 async def get_latest_reading(
     meter_id: UUID,
@@ -213,8 +306,14 @@ async def get_latest_reading(
 ):
     """Get the latest reading for a meter"""
     
+    cache_key = latest_reading_cache_key(meter_id, current_user.id)
+    cached = await cache_get(cache_key)
+    if cached:
+        return ReadingResponse.model_validate_json(cached)
+    
     query = await db.execute(
         select(Reading)
+        .options(raiseload("*"))
         .where(and_(Reading.meter_id == meter_id, Reading.user_id == current_user.id))
         .order_by(Reading.captured_at.desc())
         .limit(1)
@@ -227,7 +326,10 @@ async def get_latest_reading(
             detail="No readings found for this meter"
         )
     
-    return reading
+    response = ReadingResponse.model_validate(reading)
+    await cache_set(cache_key, response.model_dump_json())
+    
+    return response
 
 
 @router.get("/{reading_id}", response_model=ReadingResponse)
@@ -238,16 +340,24 @@ async def get_reading(
 ):
     """Get a specific reading"""
     
-    query = await db.execute(
-        select(Reading).where(Reading.id == reading_id)
-    )
-    reading = query.scalar_one_or_none()
-    
-    if not reading:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Reading not found"
+    cache_key = reading_cache_key(reading_id)
+    cached = await cache_get(cache_key)
+    if cached:
+        reading = ReadingResponse.model_validate_json(cached)
+    else:
+        query = await db.execute(
+            select(Reading).options(raiseload("*")).where(Reading.id == reading_id)
         )
+        db_reading = query.scalar_one_or_none()
+        
+        if not db_reading:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Reading not found"
+            )
+        
+        reading = ReadingResponse.model_validate(db_reading)
+        await cache_set(cache_key, reading.model_dump_json())
     
     # Check access (owner or neighbor with subscription)
     if reading.user_id != current_user.id:
@@ -283,7 +393,22 @@ async def delete_reading(
         )
     
     await db.delete(reading)
+    user_total = await db.scalar(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(
+            total_readings=User.total_readings - 1,
+            average_confidence=_confidence_avg_without(reading.confidence),
+        )
+        .returning(User.total_readings)
+    )
     await db.commit()
+    await cache_delete(
+        reading_cache_key(reading_id),
+        latest_reading_cache_key(reading.meter_id, current_user.id),
+    )
+    await invalidate_users(current_user.id)
+    await leaderboard.record_total_readings(current_user.id, user_total)
 
 
 # Hardware endpoint (for MeterPi devices)
@@ -309,12 +434,6 @@ async def create_hardware_reading(
             detail="Unknown device"
         )
     
-    # Get user from device
-    user_query = await db.execute(
-        select(User).where(User.id == device.user_id)
-    )
-    user = user_query.scalar_one_or_none()
-    
     # Create reading (reuse create_reading logic)
     # ... similar to above but with device context
     
@@ -332,12 +451,26 @@ async def create_hardware_reading(
     
     db.add(new_reading)
     
+    # Keep the owner's reading counter in step
+    user_total = await db.scalar(
+        update(User)
+        .where(User.id == device.user_id)
+        .values(
+            total_readings=User.total_readings + 1,
+            average_confidence=_confidence_avg_with(reading.confidence),
+        )
+        .returning(User.total_readings)
+    )
+    
     # Update device status
-    device.last_reading_at = datetime.now(timezone.utc)
-    device.last_seen_at = datetime.now(timezone.utc)
+    now = datetime.now(timezone.utc)
+    device.last_reading_at = now
+    device.last_seen_at = now
     device.is_online = True
     
     await db.commit()
-    await db.refresh(new_reading)
+    await cache_delete(latest_reading_cache_key(reading.meter_id, device.user_id))
+    await invalidate_users(device.user_id)
+    await leaderboard.record_total_readings(device.user_id, user_total)
     
     return new_reading
@@ -2,21 +2,43 @@
 Statistics API endpoints
 """
 
+import asyncio
+import os
+import secrets
 from datetime import datetime, timezone, timedelta
 from typing import Optional, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
 from pydantic import BaseModel
-from sqlalchemy import select, func, and_, case
+from sqlalchemy import select, func, and_, case, cast, literal, text, DateTime, Integer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
-from ..models import User, Meter, Reading, Campaign
+from ..database import get_db, async_session_maker
+from ..models import User, Meter, Reading, mv_reading_daily
+from ..services import leaderboard
 from ..services.auth import get_current_user
+from ..services.cache import (
+    cache_get, cache_set, cache_delete, PLATFORM_STATS_CACHE_KEY, PLATFORM_STATS_TTL_SECONDS
+)
 
 router = APIRouter()
 
+# Shared secret for operator-only endpoints; unset disables them
+STATS_ADMIN_TOKEN = os.getenv("STATS_ADMIN_TOKEN", "")
+
+# Usage trend periods: period -> (date_trunc unit, response key, key format)
+TREND_PERIODS = {
+    "daily": ("day", "date", "%Y-%m-%d"),
+    "weekly": ("week", "week", "%Y-W%W"),
+    "monthly": ("month", "month", "%Y-%m"),
+}
+
+
+def _round_or_none(value: Optional[float], digits: int = 2) -> Optional[float]:
+    """Round a nullable aggregate, keeping 0.0 as 0.0"""
+    return None if value is None else round(value, digits)
+
 
 class UserStatsResponse(BaseModel):
     user_id: UUID
@@ -93,47 +115,41 @@ async def get_my_stats(
 ):
     """Get comprehensive stats for the current user"""
 
-    # Count meters
-    meters_result = await db.execute(
-        select(func.count(Meter.id)).where(Meter.user_id == current_user.id)
-    )
-    meters_count = meters_result.scalar() or 0
+    now = datetime.now(timezone.utc)
+    week_ago = now - timedelta(days=7)
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
-    # Readings this week
-    week_ago = datetime.now(timezone.utc) - timedelta(days=7)
-    week_readings_result = await db.execute(
-        select(func.count(Reading.id)).where(
+    # Meter count and average confidence are denormalized onto the user row;
+    # only the rolling windows need a query (index-only on user_id, captured_at)
+    stats_result = await db.execute(
+        select(
+            func.count(Reading.id).filter(Reading.captured_at >= week_ago).label("week"),
+            func.count(Reading.id).filter(Reading.captured_at >= month_start).label("month"),
+        )
+        .where(
             and_(
                 Reading.user_id == current_user.id,
-                Reading.captured_at >= week_ago
+                Reading.captured_at >= min(week_ago, month_start)
             )
         )
     )
-    readings_this_week = week_readings_result.scalar() or 0
+    stats = stats_result.one()
 
-    # Readings this month
-    month_start = datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    month_readings_result = await db.execute(
-        select(func.count(Reading.id)).where(
-            and_(
-                Reading.user_id == current_user.id,
-                Reading.captured_at >= month_start
+    # Rank by total readings, from the Redis sorted set when it's available
+    users_ahead = await leaderboard.users_ahead(current_user.total_readings)
+    if users_ahead is None:
+        users_ahead = (
+            await db.execute(
+                select(func.count(User.id))
+                .where(User.total_readings > current_user.total_readings)
             )
-        )
-    )
-    readings_this_month = month_readings_result.scalar() or 0
+        ).scalar() or 0
 
-    # Average confidence
-    confidence_result = await db.execute(
-        select(func.avg(Reading.confidence)).where(Reading.user_id == current_user.id)
-    )
-    avg_confidence = confidence_result.scalar() or 0.0
-
-    # Get user's rank by total readings
-    rank_result = await db.execute(
-        select(func.count(User.id)).where(User.total_readings > current_user.total_readings)
-    )
-    rank = (rank_result.scalar() or 0) + 1
+    meters_count = current_user.meters_count or 0
+    readings_this_week = stats.week or 0
+    readings_this_month = stats.month or 0
+    avg_confidence = current_user.average_confidence or 0.0
+    rank = users_ahead + 1
 
     # Calculate XP to next level
     xp_to_next = (current_user.level * 100 + 50) - current_user.xp
@@ -168,13 +184,13 @@ async def get_meter_stats(
 ):
     """Get detailed stats for a specific meter"""
 
-    # Get meter
+    # Get meter (only the columns the response needs)
     meter_result = await db.execute(
-        select(Meter).where(
+        select(Meter.id, Meter.name, Meter.meter_type).where(
             and_(Meter.id == meter_id, Meter.user_id == current_user.id)
         )
     )
-    meter = meter_result.scalar_one_or_none()
+    meter = meter_result.one_or_none()
 
     if not meter:
         raise HTTPException(
@@ -182,70 +198,46 @@ async def get_meter_stats(
             detail="Meter not found"
         )
 
-    # Basic stats
+    now = datetime.now(timezone.utc)
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last_month_start = (month_start - timedelta(days=1)).replace(day=1)
+    thirty_days_ago = now - timedelta(days=30)
+
+    # Usage sums come from the daily rollup (UTC days)
+    daily = mv_reading_daily.c
+
+    def usage_sum(*conditions):
+        return (
+            select(func.sum(daily.usage))
+            .where(and_(daily.meter_id == meter_id, *conditions))
+            .scalar_subquery()
+        )
+
+    # Reading counts, confidence, date range and usage sums in one round-trip
     stats_result = await db.execute(
         select(
             func.count(Reading.id).label("total"),
+            func.count(Reading.id).filter(
+                Reading.verification_status == "verified"
+            ).label("verified"),
             func.avg(Reading.confidence).label("avg_confidence"),
             func.min(Reading.captured_at).label("first_reading"),
             func.max(Reading.captured_at).label("last_reading"),
+            usage_sum(daily.day >= month_start.date()).label("usage_this_month"),
+            usage_sum(
+                daily.day >= last_month_start.date(), daily.day < month_start.date()
+            ).label("usage_last_month"),
+            usage_sum(daily.day >= thirty_days_ago.date()).label("usage_30d"),
         ).where(Reading.meter_id == meter_id)
     )
     stats = stats_result.one()
 
-    # Verified count
-    verified_result = await db.execute(
-        select(func.count(Reading.id)).where(
-            and_(
-                Reading.meter_id == meter_id,
-                Reading.verification_status == "verified"
-            )
-        )
-    )
-    verified_count = verified_result.scalar() or 0
-
-    # Calculate usage stats
-    now = datetime.now(timezone.utc)
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    last_month_start = (month_start - timedelta(days=1)).replace(day=1)
-
-    # This month's usage
-    this_month_result = await db.execute(
-        select(func.sum(Reading.usage_since_last)).where(
-            and_(
-                Reading.meter_id == meter_id,
-                Reading.captured_at >= month_start,
-                Reading.usage_since_last > 0
-            )
-        )
-    )
-    usage_this_month = this_month_result.scalar()
-
-    # Last month's usage
-    last_month_result = await db.execute(
-        select(func.sum(Reading.usage_since_last)).where(
-            and_(
-                Reading.meter_id == meter_id,
-                Reading.captured_at >= last_month_start,
-                Reading.captured_at < month_start,
-                Reading.usage_since_last > 0
-            )
-        )
-    )
-    usage_last_month = last_month_result.scalar()
+    verified_count = stats.verified or 0
+    usage_this_month = stats.usage_this_month
+    usage_last_month = stats.usage_last_month
 
     # Average daily usage (last 30 days)
-    thirty_days_ago = now - timedelta(days=30)
-    daily_usage_result = await db.execute(
-        select(func.sum(Reading.usage_since_last)).where(
-            and_(
-                Reading.meter_id == meter_id,
-                Reading.captured_at >= thirty_days_ago,
-                Reading.usage_since_last > 0
-            )
-        )
-    )
-    total_usage_30d = daily_usage_result.scalar() or 0
+    total_usage_30d = stats.usage_30d or 0
     avg_daily_usage = total_usage_30d / 30 if total_usage_30d else None
 
     # Usage trend
@@ -260,10 +252,10 @@ async def get_meter_stats(
         total_readings=stats.total or 0,
         verified_readings=verified_count,
         average_confidence=round(stats.avg_confidence or 0, 3),
-        average_daily_usage=round(avg_daily_usage, 2) if avg_daily_usage else None,
-        usage_this_month=round(usage_this_month, 2) if usage_this_month else None,
-        usage_last_month=round(usage_last_month, 2) if usage_last_month else None,
-        usage_trend_percent=round(trend_percent, 1) if trend_percent else None,
+        average_daily_usage=_round_or_none(avg_daily_usage),
+        usage_this_month=_round_or_none(usage_this_month),
+        usage_last_month=_round_or_none(usage_last_month),
+        usage_trend_percent=_round_or_none(trend_percent, 1),
         first_reading_at=stats.first_reading,
         last_reading_at=stats.last_reading
     )
@@ -290,7 +282,7 @@ async def get_neighborhood_stats(
         postal_prefix = current_user.postal_code[:3]
     else:
         # Try to get from user's meters
-        meter_result = await db.execute(
+        meter_postal = await db.scalar(
             select(Meter.postal_code).where(
                 and_(
                     Meter.user_id == current_user.id,
@@ -298,7 +290,6 @@ async def get_neighborhood_stats(
                 )
             ).limit(1)
         )
-        meter_postal = meter_result.scalar_one_or_none()
         if meter_postal:
             postal_prefix = meter_postal[:3]
 
@@ -308,96 +299,113 @@ async def get_neighborhood_stats(
             detail="No postal code found. Please update your profile or meter settings."
         )
 
-    # Get neighborhood meters
-    neighborhood_meters = await db.execute(
-        select(Meter.id).where(
-            and_(
-                Meter.postal_code.startswith(postal_prefix),
-                Meter.meter_type == meter_type
-            )
-        )
-    )
-    meter_ids = [m[0] for m in neighborhood_meters.fetchall()]
+    # Calculate neighborhood stats (last 30 days)
+    thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
 
-    if len(meter_ids) < 5:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Not enough data in your area (minimum 5 households required for privacy)"
+    # Neighborhood meters stay in the database as a subquery rather than
+    # being fetched and sent back as an IN list
+    neighborhood_meter_ids = select(Meter.id).where(
+        and_(
+            Meter.postal_code.startswith(postal_prefix),
+            Meter.meter_type == meter_type
         )
+    )
 
-    # Calculate neighborhood stats (last 30 days)
-    thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    # Household count, evaluated once; the heavier aggregates below are gated
+    # on it in SQL, so tiny neighborhoods cost a single cheap round-trip
+    households = (
+        select(func.count().label("n"))
+        .select_from(neighborhood_meter_ids.subquery())
+        .cte("households")
+    )
+    household_count_sq = select(households.c.n).scalar_subquery()
+    enough_households = household_count_sq >= 5
 
-    # Get total readings
-    total_readings_result = await db.execute(
-        select(func.count(Reading.id)).where(
+    total_readings_sq = (
+        select(func.count(Reading.id))
+        .where(
             and_(
-                Reading.meter_id.in_(meter_ids),
+                enough_households,
+                Reading.meter_id.in_(neighborhood_meter_ids),
                 Reading.captured_at >= thirty_days_ago
             )
         )
+        .scalar_subquery()
     )
-    total_readings = total_readings_result.scalar() or 0
 
-    # Get average daily usage per meter
-    usage_per_meter = await db.execute(
-        select(
-            Reading.meter_id,
-            func.sum(Reading.usage_since_last).label("total_usage")
-        ).where(
+    # User's own daily usage, computed alongside the neighborhood distribution
+    user_meter_ids = select(Meter.id).where(
+        and_(
+            Meter.user_id == current_user.id,
+            Meter.meter_type == meter_type
+        )
+    )
+    user_usage = (
+        select((func.sum(Reading.usage_since_last) / 30.0).label("daily"))
+        .where(
             and_(
-                Reading.meter_id.in_(meter_ids),
+                enough_households,
+                Reading.meter_id.in_(user_meter_ids),
                 Reading.captured_at >= thirty_days_ago,
                 Reading.usage_since_last > 0
             )
-        ).group_by(Reading.meter_id)
-    )
-    usage_data = usage_per_meter.fetchall()
-
-    # Calculate average daily usage
-    daily_usages = [row.total_usage / 30 for row in usage_data if row.total_usage]
-
-    if not daily_usages:
-        avg_daily = 0
-        median_daily = None
-        p25 = None
-        p75 = None
-    else:
-        daily_usages.sort()
-        avg_daily = sum(daily_usages) / len(daily_usages)
-        median_daily = daily_usages[len(daily_usages) // 2]
-        p25 = daily_usages[int(len(daily_usages) * 0.25)] if len(daily_usages) >= 4 else None
-        p75 = daily_usages[int(len(daily_usages) * 0.75)] if len(daily_usages) >= 4 else None
-
-    # Get user's own usage
-    user_meters_result = await db.execute(
-        select(Meter.id).where(
-            and_(
-                Meter.user_id == current_user.id,
-                Meter.meter_type == meter_type
-            )
         )
+        .cte("user_usage")
     )
-    user_meter_ids = [m[0] for m in user_meters_result.fetchall()]
+    user_daily = select(user_usage.c.daily).scalar_subquery()
 
-    user_usage_result = await db.execute(
-        select(func.sum(Reading.usage_since_last)).where(
+    # Average daily usage per meter, with the distribution computed in SQL
+    per_meter = (
+        select((func.sum(Reading.usage_since_last) / 30.0).label("daily"))
+        .where(
             and_(
-                Reading.meter_id.in_(user_meter_ids),
+                enough_households,
+                Reading.meter_id.in_(neighborhood_meter_ids),
                 Reading.captured_at >= thirty_days_ago,
                 Reading.usage_since_last > 0
             )
         )
+        .group_by(Reading.meter_id)
+        .cte("per_meter")
     )
-    user_total_usage = user_usage_result.scalar() or 0
-    user_daily_usage = user_total_usage / 30 if user_total_usage else None
+    distribution_result = await db.execute(
+        select(
+            household_count_sq.label("household_count"),
+            total_readings_sq.label("total_readings"),
+            user_daily.label("user_daily"),
+            func.count().label("meter_count"),
+            func.avg(per_meter.c.daily).label("avg_daily"),
+            func.percentile_cont(0.25).within_group(per_meter.c.daily).label("p25"),
+            func.percentile_cont(0.5).within_group(per_meter.c.daily).label("p50"),
+            func.percentile_cont(0.75).within_group(per_meter.c.daily).label("p75"),
+            func.count().filter(
+                per_meter.c.daily < func.coalesce(user_daily, 0)
+            ).label("below_count"),
+        ).select_from(per_meter)
+    )
+    distribution = distribution_result.one()
+    household_count = distribution.household_count or 0
+    total_readings = distribution.total_readings or 0
+
+    if household_count < 5:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Not enough data in your area (minimum 5 households required for privacy)"
+        )
+
+    user_daily_usage = distribution.user_daily
+
+    meters_with_usage = distribution.meter_count or 0
+    avg_daily = distribution.avg_daily or 0
+    median_daily = distribution.p50
+    p25 = distribution.p25 if meters_with_usage >= 4 else None
+    p75 = distribution.p75 if meters_with_usage >= 4 else None
 
     # Calculate percentile
     user_percentile = None
     comparison = "average"
-    if user_daily_usage and daily_usages:
-        below_count = sum(1 for u in daily_usages if u < user_daily_usage)
-        user_percentile = int((below_count / len(daily_usages)) * 100)
+    if user_daily_usage and meters_with_usage:
+        user_percentile = int((distribution.below_count / meters_with_usage) * 100)
 
         if user_percentile < 33:
             comparison = "below_average"
@@ -407,105 +415,89 @@ async def get_neighborhood_stats(
     return NeighborhoodStatsResponse(
         postal_code_prefix=postal_prefix,
         meter_type=meter_type,
-        household_count=len(meter_ids),
+        household_count=household_count,
         total_readings=total_readings,
         average_daily_usage=round(avg_daily, 2),
-        median_daily_usage=round(median_daily, 2) if median_daily else None,
-        percentile_25=round(p25, 2) if p25 else None,
-        percentile_75=round(p75, 2) if p75 else None,
-        your_average_daily_usage=round(user_daily_usage, 2) if user_daily_usage else None,
+        median_daily_usage=_round_or_none(median_daily),
+        percentile_25=_round_or_none(p25),
+        percentile_75=_round_or_none(p75),
+        your_average_daily_usage=_round_or_none(user_daily_usage),
         your_percentile=user_percentile,
         comparison=comparison
     )
 
 
-@router.get("/platform", response_model=PlatformStatsResponse)
-async def get_platform_stats(
-    db: AsyncSession = Depends(get_db)
-):
-    """Get overall platform statistics (public)"""
-
-    now = datetime.now(timezone.utc)
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    week_ago = now - timedelta(days=7)
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-    # Total users
-    users_result = await db.execute(select(func.count(User.id)))
-    total_users = users_result.scalar() or 0
-
-    # Total meters
-    meters_result = await db.execute(select(func.count(Meter.id)))
-    total_meters = meters_result.scalar() or 0
+async def _rows_in_own_session(stmt):
+    """Run a query on a sibling session and return all rows"""
+    async with async_session_maker() as session:
+        result = await session.execute(stmt)
+        return result.fetchall()
 
-    # Total readings
-    readings_result = await db.execute(select(func.count(Reading.id)))
-    total_readings = readings_result.scalar() or 0
 
-    # Readings today
-    today_result = await db.execute(
-        select(func.count(Reading.id)).where(Reading.captured_at >= today_start)
-    )
-    readings_today = today_result.scalar() or 0
-
-    # Readings this week
-    week_result = await db.execute(
-        select(func.count(Reading.id)).where(Reading.captured_at >= week_ago)
-    )
-    readings_this_week = week_result.scalar() or 0
-
-    # Readings this month
-    month_result = await db.execute(
-        select(func.count(Reading.id)).where(Reading.captured_at >= month_start)
-    )
-    readings_this_month = month_result.scalar() or 0
-
-    # Active campaigns
-    campaigns_result = await db.execute(
-        select(func.count(Campaign.id)).where(
-            and_(
-                Campaign.is_active == True,
-                Campaign.end_date >= now
+@router.get("/platform", response_model=PlatformStatsResponse)
+async def get_platform_stats():
+    """
+    Get overall platform statistics (public)
+
+    Served from mv_platform_stats / mv_platform_top_regions, which are
+    refreshed every few minutes, so figures may lag slightly. The response
+    is also cached in Redis for a minute.
+    """
+
+    cached = await cache_get(PLATFORM_STATS_CACHE_KEY)
+    if cached:
+        return PlatformStatsResponse.model_validate_json(cached)
+
+    totals, top_regions_rows = await asyncio.gather(
+        _rows_in_own_session(text("SELECT * FROM mv_platform_stats")),
+        _rows_in_own_session(
+            text(
+                "SELECT region, reading_count FROM mv_platform_top_regions "
+                "ORDER BY reading_count DESC LIMIT 10"
             )
-        )
+        ),
     )
-    active_campaigns = campaigns_result.scalar() or 0
+    stats = totals[0] if totals else None
 
-    # Countries represented
-    countries_result = await db.execute(
-        select(func.count(func.distinct(User.country))).where(User.country.isnot(None))
-    )
-    countries = countries_result.scalar() or 0
-
-    # Top regions by readings
-    region_expr = func.left(Meter.postal_code, 3)
-    top_regions_result = await db.execute(
-        select(
-            region_expr.label("region"),
-            func.count(Reading.id).label("reading_count")
-        )
-        .join(Reading, Reading.meter_id == Meter.id)
-        .where(Meter.postal_code.isnot(None))
-        .group_by(region_expr)
-        .order_by(func.count(Reading.id).desc())
-        .limit(10)
-    )
     top_regions = [
         {"region": row.region, "readings": row.reading_count}
-        for row in top_regions_result.fetchall()
+        for row in top_regions_rows
     ]
 
-    return PlatformStatsResponse(
-        total_users=total_users,
-        total_meters=total_meters,
-        total_readings=total_readings,
-        readings_today=readings_today,
-        readings_this_week=readings_this_week,
-        readings_this_month=readings_this_month,
-        active_campaigns=active_campaigns,
-        countries_represented=countries,
+    response = PlatformStatsResponse(
+        total_users=stats.total_users if stats else 0,
+        total_meters=stats.total_meters if stats else 0,
+        total_readings=stats.total_readings if stats else 0,
+        readings_today=stats.readings_today if stats else 0,
+        readings_this_week=stats.readings_this_week if stats else 0,
+        readings_this_month=stats.readings_this_month if stats else 0,
+        active_campaigns=stats.active_campaigns if stats else 0,
+        countries_represented=stats.countries_represented if stats else 0,
         top_regions=top_regions
     )
+    await cache_set(
+        PLATFORM_STATS_CACHE_KEY, response.model_dump_json(), ttl=PLATFORM_STATS_TTL_SECONDS
+    )
+
+    return response
+
+
+@router.post("/platform/invalidate", status_code=status.HTTP_204_NO_CONTENT)
+async def invalidate_platform_stats(
+    x_admin_token: Optional[str] = Header(None)
+):
+    """
+    Drop the cached platform stats so the next request reads fresh values.
+    Operator-only: requires the X-Admin-Token header to match STATS_ADMIN_TOKEN.
+    """
+    if not STATS_ADMIN_TOKEN or not secrets.compare_digest(
+        (x_admin_token or "").encode(), STATS_ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not allowed"
+        )
+    await cache_delete(PLATFORM_STATS_CACHE_KEY)
 
 
 @router.get("/usage/trends", response_model=UsageTrendResponse)
@@ -519,14 +511,13 @@ async def get_usage_trends(
     """Get usage trends for a meter over time"""
 
     # Verify meter ownership
-    meter_result = await db.execute(
-        select(Meter).where(
+    owns_meter = await db.scalar(
+        select(literal(1)).where(
             and_(Meter.id == meter_id, Meter.user_id == current_user.id)
         )
     )
-    meter = meter_result.scalar_one_or_none()
 
-    if not meter:
+    if not owns_meter:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Meter not found"
@@ -535,77 +526,36 @@ async def get_usage_trends(
     now = datetime.now(timezone.utc)
     start_date = now - timedelta(days=days)
 
-    # Get readings with usage data
-    readings_result = await db.execute(
-        select(Reading.captured_at, Reading.usage_since_last, Reading.numeric_value)
+    # Roll the daily pre-aggregates up into periods; only one row per period
+    # comes back, so memory is bounded by the bucket count, not reading count
+    date_trunc_unit, key_name, key_format = TREND_PERIODS[period]
+    daily = mv_reading_daily.c
+    bucket = func.date_trunc(date_trunc_unit, cast(daily.day, DateTime)).label("bucket")
+
+    buckets_result = await db.execute(
+        select(
+            bucket,
+            func.sum(daily.usage).label("usage"),
+            cast(func.sum(daily.usage_readings), Integer).label("readings"),
+        )
         .where(
             and_(
-                Reading.meter_id == meter_id,
-                Reading.captured_at >= start_date,
-                Reading.usage_since_last.isnot(None)
+                daily.meter_id == meter_id,
+                daily.day >= start_date.date()
             )
         )
-        .order_by(Reading.captured_at)
+        .group_by(bucket)
+        .order_by(bucket)
     )
-    readings = readings_result.fetchall()
-
-    # Aggregate by period
-    data = []
-
-    if period == "daily":
-        # Group by date
-        daily_data = {}
-        for reading in readings:
-            date_key = reading.captured_at.strftime("%Y-%m-%d")
-            if date_key not in daily_data:
-                daily_data[date_key] = {"usage": 0, "count": 0}
-            if reading.usage_since_last and reading.usage_since_last > 0:
-                daily_data[date_key]["usage"] += reading.usage_since_last
-                daily_data[date_key]["count"] += 1
-
-        for date_key in sorted(daily_data.keys()):
-            data.append({
-                "date": date_key,
-                "usage": round(daily_data[date_key]["usage"], 2),
-                "readings": daily_data[date_key]["count"]
-            })
-
-    elif period == "weekly":
-        # Group by week
-        weekly_data = {}
-        for reading in readings:
-            # Get ISO week
-            week_key = reading.captured_at.strftime("%Y-W%W")
-            if week_key not in weekly_data:
-                weekly_data[week_key] = {"usage": 0, "count": 0}
-            if reading.usage_since_last and reading.usage_since_last > 0:
-                weekly_data[week_key]["usage"] += reading.usage_since_last
-                weekly_data[week_key]["count"] += 1
-
-        for week_key in sorted(weekly_data.keys()):
-            data.append({
-                "week": week_key,
-                "usage": round(weekly_data[week_key]["usage"], 2),
-                "readings": weekly_data[week_key]["count"]
-            })
-
-    elif period == "monthly":
-        # Group by month
-        monthly_data = {}
-        for reading in readings:
-            month_key = reading.captured_at.strftime("%Y-%m")
-            if month_key not in monthly_data:
-                monthly_data[month_key] = {"usage": 0, "count": 0}
-            if reading.usage_since_last and reading.usage_since_last > 0:
-                monthly_data[month_key]["usage"] += reading.usage_since_last
-                monthly_data[month_key]["count"] += 1
-
-        for month_key in sorted(monthly_data.keys()):
-            data.append({
-                "month": month_key,
-                "usage": round(monthly_data[month_key]["usage"], 2),
-                "readings": monthly_data[month_key]["count"]
-            })
+
+    data = [
+        {
+            key_name: row.bucket.strftime(key_format),
+            "usage": round(row.usage or 0, 2),
+            "readings": row.readings
+        }
+        for row in buckets_result
+    ]
 
     return UsageTrendResponse(
         meter_id=meter_id,
@@ -642,30 +592,38 @@ async def get_usage_comparison(
     thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
 
     # Your usage
+    daily = mv_reading_daily.c
     your_usage_result = await db.execute(
-        select(func.sum(Reading.usage_since_last)).where(
+        select(func.sum(daily.usage)).where(
             and_(
-                Reading.meter_id.in_(user_meter_ids),
-                Reading.captured_at >= thirty_days_ago,
-                Reading.usage_since_last > 0
+                daily.meter_id.in_(user_meter_ids),
+                daily.day >= thirty_days_ago.date(),
+                daily.usage > 0
             )
         )
     )
     your_total = your_usage_result.scalar() or 0
     your_daily_avg = your_total / 30
 
-    # Platform average
-    platform_result = await db.execute(
-        select(
-            func.sum(Reading.usage_since_last).label("total"),
-            func.count(func.distinct(Reading.meter_id)).label("meter_count")
-        ).join(Meter, Meter.id == Reading.meter_id).where(
+    # Platform average; grouping per meter first lets Postgres hash-aggregate
+    # instead of sorting for COUNT(DISTINCT meter_id)
+    per_meter = (
+        select(func.sum(daily.usage).label("usage"))
+        .where(
             and_(
-                Meter.meter_type == meter_type,
-                Reading.captured_at >= thirty_days_ago,
-                Reading.usage_since_last > 0
+                daily.meter_type == meter_type,
+                daily.day >= thirty_days_ago.date(),
+                daily.usage > 0
             )
         )
+        .group_by(daily.meter_id)
+        .subquery("per_meter")
+    )
+    platform_result = await db.execute(
+        select(
+            func.sum(per_meter.c.usage).label("total"),
+            func.count().label("meter_count")
+        ).select_from(per_meter)
     )
     platform_stats = platform_result.one()
 
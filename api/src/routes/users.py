@@ -2,21 +2,36 @@
 Users API endpoints
 """
 
+import json
+import secrets
 from datetime import datetime
 from typing import Optional
 from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from pydantic import BaseModel, EmailStr
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, and_, func, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
 from ..models import User
-from ..services.auth import get_current_user, create_access_token, hash_password, verify_password
+from ..services.auth import (
+    get_current_user, get_current_user_id, create_access_token, hash_password, verify_password
+)
+from ..services.cache import (
+    cache_get, cache_set, invalidate_users, user_profile_cache_key, users_leaderboard_cache_key,
+    USER_PROFILE_TTL_SECONDS, LEADERBOARD_TTL_SECONDS
+)
+from ..services.rate_limit import rate_limit
 
 router = APIRouter()
 
+# Referral codes: no 0/O or 1/I to avoid ambiguity
+REFERRAL_CODE_ALPHABET = b"ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+REFERRAL_CODE_LENGTH = 6
+REFERRAL_CODE_ATTEMPTS = 5
+
 
 class UserCreate(BaseModel):
     email: Optional[EmailStr] = None
@@ -66,50 +81,57 @@ class TokenResponse(BaseModel):
 
 def generate_referral_code() -> str:
     """Generate a unique referral code"""
-    chars = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
-    import random
-    return ''.join(random.choice(chars) for _ in range(6))
+    # 32-symbol alphabet, so masking each random byte to 5 bits is uniform
+    return bytes(
+        REFERRAL_CODE_ALPHABET[b & 31] for b in secrets.token_bytes(REFERRAL_CODE_LENGTH)
+    ).decode()
 
 
-@router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/register",
+    response_model=TokenResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("register", 5, 60))],
+)
 async def register(
     user_data: UserCreate,
     db: AsyncSession = Depends(get_db)
 ):
     """Register a new user"""
     
-    # Check if email exists
-    if user_data.email:
-        existing = await db.execute(
-            select(User).where(User.email == user_data.email)
-        )
-        if existing.scalar_one_or_none():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
+    password_hash = await hash_password(user_data.password) if user_data.password else None
+
+    # Email and referral code uniqueness are enforced by their UNIQUE
+    # constraints, so the happy path is a single INSERT; a referral code
+    # collision retries with a fresh code
+    for _ in range(REFERRAL_CODE_ATTEMPTS):
+        try:
+            user = await db.scalar(
+                insert(User)
+                .values(
+                    email=user_data.email,
+                    display_name=user_data.display_name,
+                    password_hash=password_hash,
+                    referral_code=generate_referral_code(),
+                )
+                .returning(User)
             )
-    
-    # Generate unique referral code
-    referral_code = generate_referral_code()
-    while True:
-        check = await db.execute(
-            select(User).where(User.referral_code == referral_code)
-        )
-        if not check.scalar_one_or_none():
+            await db.commit()
             break
-        referral_code = generate_referral_code()
-    
-    # Create user
-    user = User(
-        email=user_data.email,
-        display_name=user_data.display_name,
-        password_hash=hash_password(user_data.password) if user_data.password else None,
-        referral_code=referral_code,
-    )
-    
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
+        except IntegrityError as e:
+            await db.rollback()
+            if "users_email_key" in str(e.orig):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Email already registered"
+                )
+            if "users_referral_code_key" not in str(e.orig):
+                raise
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Could not allocate a referral code, please retry"
+        )
     
     # Generate token
     token = create_access_token({"sub": str(user.id)})
@@ -117,33 +139,52 @@ async def register(
     return TokenResponse(access_token=token, user=user)
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    dependencies=[Depends(rate_limit("login", 10, 60))],
+)
 async def login(
     credentials: UserLogin,
     db: AsyncSession = Depends(get_db)
 ):
     """Login with email and password"""
     
-    result = await db.execute(
-        select(User).where(User.email == credentials.email)
-    )
-    user = result.scalar_one_or_none()
+    # Check the password before touching the row, so failed attempts never
+    # write or lock it
+    account = (
+        await db.execute(
+            select(User.id, User.password_hash).where(
+                and_(
+                    User.email == credentials.email,
+                    User.password_hash.isnot(None)
+                )
+            )
+        )
+    ).one_or_none()
+    # End the read transaction so the connection isn't held through bcrypt
+    await db.rollback()
     
-    if not user or not user.password_hash:
+    if not account or not await verify_password(credentials.password, account.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
     
-    if not verify_password(credentials.password, user.password_hash):
+    user = await db.scalar(
+        update(User)
+        .where(User.id == account.id)
+        .values(last_login_at=func.now())
+        .returning(User)
+    )
+    await db.commit()
+    if not user:
+        # Account deleted while the password was being checked
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
-    
-    # Update last login
-    user.last_login_at = datetime.utcnow()
-    await db.commit()
+    await invalidate_users(user.id)
     
     token = create_access_token({"sub": str(user.id)})
     
@@ -152,10 +193,28 @@ async def login(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get current user profile"""
-    return current_user
+    """Get current user profile (cached briefly; polled on every page load)"""
+    
+    cache_key = user_profile_cache_key(user_id)
+    cached = await cache_get(cache_key)
+    if cached:
+        return UserResponse.model_validate_json(cached)
+    
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    response = UserResponse.model_validate(user)
+    await cache_set(cache_key, response.model_dump_json(), ttl=USER_PROFILE_TTL_SECONDS)
+    
+    return response
 
 
 @router.patch("/me", response_model=UserResponse)
@@ -166,19 +225,35 @@ async def update_current_user(
 ):
     """Update current user profile"""
     
+    values = {}
     if user_update.display_name:
-        current_user.display_name = user_update.display_name
+        values["display_name"] = user_update.display_name
     if user_update.avatar_emoji:
-        current_user.avatar_emoji = user_update.avatar_emoji
+        values["avatar_emoji"] = user_update.avatar_emoji
     if user_update.postal_code:
-        current_user.postal_code = user_update.postal_code
+        values["postal_code"] = user_update.postal_code
     if user_update.country:
-        current_user.country = user_update.country
+        values["country"] = user_update.country
+    
+    if not values:
+        # current_user may come from the user cache, which lacks e.g. email
+        return await db.scalar(
+            select(User)
+            .where(User.id == current_user.id)
+            .execution_options(populate_existing=True)
+        )
     
+    # Apply and read back the updated row in one round-trip
+    user = await db.scalar(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(**values)
+        .returning(User)
+    )
     await db.commit()
-    await db.refresh(current_user)
+    await invalidate_users(current_user.id)
     
-    return current_user
+    return user
 
 
 @router.post("/referral/{code}")
@@ -203,26 +278,40 @@ async def apply_referral(
             detail="Already used a referral code"
         )
     
-    # Find referrer
-    result = await db.execute(
-        select(User).where(User.referral_code == code.upper())
+    # Find and credit the referrer in one atomic UPDATE
+    referrer_id = await db.scalar(
+        update(User)
+        .where(User.referral_code == code.upper())
+        .values(
+            referral_count=User.referral_count + 1,
+            xp=User.xp + 50,  # Bonus XP for referral
+        )
+        .returning(User.id)
     )
-    referrer = result.scalar_one_or_none()
     
-    if not referrer:
+    if not referrer_id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Invalid referral code"
         )
     
-    # Apply referral
-    current_user.referred_by_id = referrer.id
-    referrer.referral_count += 1
-    referrer.xp += 50  # Bonus XP for referral
+    # Apply referral; the IS NULL guard makes concurrent requests credit once
+    applied = await db.execute(
+        update(User)
+        .where(User.id == current_user.id, User.referred_by_id.is_(None))
+        .values(referred_by_id=referrer_id)
+    )
+    if applied.rowcount == 0:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Already used a referral code"
+        )
     
     # TODO: Apply referral rewards based on count
     
     await db.commit()
+    await invalidate_users(current_user.id, referrer_id)
     
     return {"message": "Referral applied successfully"}
 
@@ -233,21 +322,62 @@ async def get_leaderboard(
     postal_code: Optional[str] = None,
     campaign_id: Optional[UUID] = None,
     limit: int = 50,
+    after_score: Optional[int] = None,
+    after_id: Optional[UUID] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get leaderboard"""
+    """
+    Get leaderboard (first page cached for a minute; identical for every caller).
     
-    query = select(User).order_by(User.total_readings.desc()).limit(limit)
+    Pages after the first are fetched with the last entry's total_readings
+    and user_id as after_score / after_id.
+    """
     
-    if scope == "local" and postal_code:
-        query = query.where(User.postal_code.startswith(postal_code[:3]))
+    postal_prefix = postal_code[:3] if scope == "local" and postal_code else None
+    paginated = after_score is not None and after_id is not None
+    cache_key = users_leaderboard_cache_key(postal_prefix, limit)
+    if not paginated:
+        cached = await cache_get(cache_key)
+        if cached:
+            return Response(content=cached, media_type="application/json")
+    
+    # Only the returned columns, so the covering indexes give an index-only scan
+    query = select(
+        User.id,
+        User.display_name,
+        User.avatar_emoji,
+        User.level,
+        User.total_readings,
+        User.streak_days,
+        User.trust_score,
+    ).order_by(User.total_readings.desc(), User.id.desc()).limit(limit)
+    
+    postal_filter = None
+    if postal_prefix:
+        if len(postal_prefix) == 3:
+            # Matches the left(postal_code, 3) expression index
+            postal_filter = func.left(User.postal_code, 3) == postal_prefix
+        else:
+            # Shorter prefixes still match every postal code starting with them
+            postal_filter = User.postal_code.startswith(postal_prefix)
+        query = query.where(postal_filter)
+    
+    rank_offset = 0
+    if paginated:
+        # Keyset cursor: a range scan on (total_readings DESC, id DESC)
+        cursor = tuple_(User.total_readings, User.id) < tuple_(after_score, after_id)
+        query = query.where(cursor)
+        ahead = select(func.count()).select_from(User).where(~cursor)
+        if postal_filter is not None:
+            ahead = ahead.where(postal_filter)
+        rank_offset = await db.scalar(ahead)
     
     result = await db.execute(query)
-    users = result.scalars().all()
+    users = result.all()
     
-    return [
+    leaderboard = [
         {
-            "rank": i + 1,
+            "rank": rank_offset + i + 1,
             "user_id": str(u.id),
             "display_name": u.display_name,
             "avatar_emoji": u.avatar_emoji,
@@ -258,3 +388,7 @@ async def get_leaderboard(
         }
         for i, u in enumerate(users)
     ]
+    if not paginated:
+        await cache_set(cache_key, json.dumps(leaderboard), ttl=LEADERBOARD_TTL_SECONDS)
+    
+    return leaderboard
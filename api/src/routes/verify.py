@@ -5,18 +5,29 @@ Community verification system for meter readings.
 Users can vote on readings (correct/incorrect/unclear) to build trust.
 """
 
-from datetime import datetime, timezone, timedelta
+import json
+from datetime import datetime
 from typing import Optional, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from pydantic import BaseModel
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import (
+    select, insert, update, exists, func, case, and_, or_, tuple_, literal_column
+)
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
 from ..models import User, Reading, VerificationVote, Meter
 from ..services.auth import get_current_user
+from ..services.cache import (
+    cache_get, cache_set, cache_delete, invalidate_users, reading_cache_key,
+    latest_reading_cache_key, verification_history_cache_key,
+    verification_leaderboard_cache_key, LEADERBOARD_TTL_SECONDS,
+    VERIFICATION_HISTORY_TTL_SECONDS
+)
 
 router = APIRouter()
 
@@ -72,6 +83,13 @@ class VerificationStatusResponse(BaseModel):
     your_vote: Optional[str]
 
 
+class HistoryStats(BaseModel):
+    total: int
+    this_week: int
+    finalized: int
+    matches: int
+
+
 class VerificationHistoryResponse(BaseModel):
     total_verifications: int
     verifications_this_week: int
@@ -85,6 +103,9 @@ class VerificationHistoryResponse(BaseModel):
 async def get_verification_queue(
     meter_type: Optional[str] = None,
     limit: int = Query(10, ge=1, le=50),
+    after_votes: Optional[int] = None,
+    after_confidence: Optional[float] = None,
+    after_id: Optional[UUID] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -96,37 +117,36 @@ async def get_verification_queue(
     - Have not been voted on by the current user
     - Are still pending verification
     - Have less than VOTES_REQUIRED votes
-    """
 
-    # Subquery for readings already voted on by this user
-    voted_subquery = select(VerificationVote.reading_id).where(
-        VerificationVote.verifier_id == current_user.id
-    )
+    The next page is fetched with the last reading's votes_count, confidence
+    and id as after_votes / after_confidence / after_id; total_available then
+    counts the readings from that point on.
+    """
 
-    # Subquery for vote counts
-    vote_count_subquery = (
-        select(
-            VerificationVote.reading_id,
-            func.count(VerificationVote.id).label("vote_count")
+    # Readings already voted on by this user (NOT EXISTS plans as an anti-join)
+    not_voted = ~exists().where(
+        and_(
+            VerificationVote.reading_id == Reading.id,
+            VerificationVote.verifier_id == current_user.id
         )
-        .group_by(VerificationVote.reading_id)
-        .subquery()
     )
 
     # Main query
     query = (
-        select(Reading, Meter.meter_type, Meter.postal_code)
+        select(
+            Reading,
+            Meter.meter_type,
+            func.left(Meter.postal_code, 3).label("postal_code_prefix"),
+            # Pre-LIMIT match count, computed in the same pass
+            func.count().over().label("total_available"),
+        )
         .join(Meter, Meter.id == Reading.meter_id)
-        .outerjoin(vote_count_subquery, vote_count_subquery.c.reading_id == Reading.id)
         .where(
             and_(
                 Reading.user_id != current_user.id,  # Not own readings
-                Reading.id.notin_(voted_subquery),  # Not already voted
+                not_voted,  # Not already voted
                 Reading.verification_status == "pending",  # Still pending
-                or_(
-                    vote_count_subquery.c.vote_count.is_(None),
-                    vote_count_subquery.c.vote_count < VOTES_REQUIRED
-                )
+                Reading.votes_total < VOTES_REQUIRED
             )
         )
     )
@@ -134,49 +154,30 @@ async def get_verification_queue(
     if meter_type:
         query = query.where(Meter.meter_type == meter_type)
 
+    if after_votes is not None and after_confidence is not None and after_id is not None:
+        # Keyset cursor: a range scan on the pending queue index
+        query = query.where(
+            tuple_(Reading.votes_total, Reading.confidence, Reading.id)
+            < tuple_(after_votes, after_confidence, after_id)
+        )
+
     # Prioritize readings with higher confidence (more likely correct)
     # and those with some votes already (closer to resolution)
     query = query.order_by(
-        vote_count_subquery.c.vote_count.desc().nulls_last(),
-        Reading.confidence.desc()
+        Reading.votes_total.desc(),
+        Reading.confidence.desc(),
+        Reading.id.desc()
     ).limit(limit)
 
     result = await db.execute(query)
     rows = result.fetchall()
 
-    # Get vote counts for each reading
-    reading_ids = [row[0].id for row in rows]
-    vote_counts = {}
-    if reading_ids:
-        counts_result = await db.execute(
-            select(
-                VerificationVote.reading_id,
-                func.count(VerificationVote.id)
-            )
-            .where(VerificationVote.reading_id.in_(reading_ids))
-            .group_by(VerificationVote.reading_id)
-        )
-        vote_counts = {row[0]: row[1] for row in counts_result.fetchall()}
-
-    # Count total available
-    total_query = (
-        select(func.count(Reading.id))
-        .where(
-            and_(
-                Reading.user_id != current_user.id,
-                Reading.id.notin_(voted_subquery),
-                Reading.verification_status == "pending"
-            )
-        )
-    )
-    total_result = await db.execute(total_query)
-    total_available = total_result.scalar() or 0
+    total_available = rows[0].total_available if rows else 0
 
     readings = []
     for row in rows:
         reading = row[0]
         meter_type_val = row[1]
-        postal_code = row[2]
 
         readings.append(ReadingForVerification(
             id=reading.id,
@@ -186,8 +187,8 @@ async def get_verification_queue(
             confidence=reading.confidence,
             image_url=reading.image_url,
             captured_at=reading.captured_at,
-            votes_count=vote_counts.get(reading.id, 0),
-            postal_code_prefix=postal_code[:3] if postal_code else None
+            votes_count=reading.votes_total,
+            postal_code_prefix=row.postal_code_prefix
         ))
 
     return VerificationQueueResponse(
@@ -227,11 +228,24 @@ async def vote_on_reading(
             detail="Please provide suggested_value when voting 'incorrect'"
         )
 
-    # Get the reading
+    # Get the reading and whether this user already voted on it
+    already_voted = exists().where(
+        and_(
+            VerificationVote.reading_id == reading_id,
+            VerificationVote.verifier_id == current_user.id
+        )
+    )
     reading_result = await db.execute(
-        select(Reading).where(Reading.id == reading_id)
+        select(
+            Reading.id,
+            Reading.user_id,
+            Reading.meter_id,
+            Reading.verification_status,
+            already_voted.label("already_voted")
+        )
+        .where(Reading.id == reading_id)
     )
-    reading = reading_result.scalar_one_or_none()
+    reading = reading_result.one_or_none()
 
     if not reading:
         raise HTTPException(
@@ -246,40 +260,81 @@ async def vote_on_reading(
             detail="Cannot verify your own readings"
         )
 
+    # Verification is already final
+    if reading.verification_status != "pending":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This reading's verification is already finalized"
+        )
+
     # Check if already voted
-    existing_vote = await db.execute(
-        select(VerificationVote).where(
-            and_(
-                VerificationVote.reading_id == reading_id,
-                VerificationVote.verifier_id == current_user.id
+    if reading.already_voted:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You have already voted on this reading"
+        )
+
+    # Create vote; INSERT ... RETURNING loads id and created_at, and runs now
+    # so the tally in finalization sees it (the session doesn't autoflush)
+    try:
+        vote = await db.scalar(
+            insert(VerificationVote)
+            .values(
+                reading_id=reading_id,
+                verifier_id=current_user.id,
+                vote=vote_data.vote,
+                suggested_value=vote_data.suggested_value,
+                verifier_trust_score=current_user.trust_score
             )
+            .returning(VerificationVote)
         )
-    )
-    if existing_vote.scalar_one_or_none():
+    except IntegrityError:
+        # Lost a race with a concurrent vote from the same user
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="You have already voted on this reading"
         )
 
-    # Create vote
-    vote = VerificationVote(
-        reading_id=reading_id,
-        verifier_id=current_user.id,
-        vote=vote_data.vote,
-        suggested_value=vote_data.suggested_value,
-        verifier_trust_score=current_user.trust_score
+    # Bump the reading's tallies; RETURNING gives the count including
+    # concurrent votes
+    vote_column = f"votes_{vote_data.vote}"
+    votes_total = await db.scalar(
+        update(Reading)
+        .where(Reading.id == reading_id)
+        .values({
+            Reading.votes_total: Reading.votes_total + 1,
+            getattr(Reading, vote_column): getattr(Reading, vote_column) + 1,
+        })
+        .returning(Reading.votes_total)
+        .execution_options(synchronize_session=False)
     )
-    db.add(vote)
 
-    # Update user stats
-    current_user.verifications_performed += 1
-    current_user.xp += XP_FOR_VERIFICATION
+    # Update user stats (atomic: current_user may come from the user cache)
+    await db.execute(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(
+            verifications_performed=User.verifications_performed + 1,
+            xp=User.xp + XP_FOR_VERIFICATION,
+        )
+    )
 
     # Check if we have enough votes to finalize
-    await _check_and_finalize_verification(reading, db, current_user)
+    rewarded_user_ids = await _check_and_finalize_verification(reading, votes_total, db)
 
     await db.commit()
-    await db.refresh(vote)
+
+    # Verification status may have changed
+    await cache_delete(
+        reading_cache_key(reading_id),
+        latest_reading_cache_key(reading.meter_id, reading.user_id),
+    )
+    await invalidate_users(current_user.id, *rewarded_user_ids)
+    await cache_delete(
+        *(verification_history_cache_key(user_id)
+          for user_id in {current_user.id, *rewarded_user_ids})
+    )
 
     return vote
 
@@ -292,11 +347,17 @@ async def get_verification_status(
 ):
     """Get the verification status of a reading."""
 
-    # Get the reading
+    # Get the reading's status and vote counters
     reading_result = await db.execute(
-        select(Reading).where(Reading.id == reading_id)
+        select(
+            Reading.verification_status,
+            Reading.votes_total,
+            Reading.votes_correct,
+            Reading.votes_incorrect,
+            Reading.votes_unclear
+        ).where(Reading.id == reading_id)
     )
-    reading = reading_result.scalar_one_or_none()
+    reading = reading_result.one_or_none()
 
     if not reading:
         raise HTTPException(
@@ -304,21 +365,10 @@ async def get_verification_status(
             detail="Reading not found"
         )
 
-    # Get vote counts
-    votes_result = await db.execute(
-        select(
-            VerificationVote.vote,
-            func.count(VerificationVote.id)
-        )
-        .where(VerificationVote.reading_id == reading_id)
-        .group_by(VerificationVote.vote)
-    )
-    vote_counts = {row[0]: row[1] for row in votes_result.fetchall()}
-
-    votes_correct = vote_counts.get("correct", 0)
-    votes_incorrect = vote_counts.get("incorrect", 0)
-    votes_unclear = vote_counts.get("unclear", 0)
-    total_votes = votes_correct + votes_incorrect + votes_unclear
+    votes_correct = reading.votes_correct
+    votes_incorrect = reading.votes_incorrect
+    votes_unclear = reading.votes_unclear
+    total_votes = reading.votes_total
 
     # Check if user has voted
     user_vote_result = await db.execute(
@@ -356,53 +406,24 @@ async def get_verification_history(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get the current user's verification history and stats."""
-
-    # Total verifications
-    total_result = await db.execute(
-        select(func.count(VerificationVote.id)).where(
-            VerificationVote.verifier_id == current_user.id
+    """Get the current user's verification history and stats (stats cached briefly)."""
+
+    stats_cache_key = verification_history_cache_key(current_user.id)
+    cached = await cache_get(stats_cache_key)
+    if cached:
+        stats = HistoryStats.model_validate_json(cached)
+    else:
+        stats = await _verification_history_stats(db, current_user.id)
+        await cache_set(
+            stats_cache_key, stats.model_dump_json(), ttl=VERIFICATION_HISTORY_TTL_SECONDS
         )
-    )
-    total_verifications = total_result.scalar() or 0
-
-    # Verifications this week
-    week_ago = datetime.now(timezone.utc) - timedelta(days=7)
-    week_result = await db.execute(
-        select(func.count(VerificationVote.id)).where(
-            and_(
-                VerificationVote.verifier_id == current_user.id,
-                VerificationVote.created_at >= week_ago
-            )
-        )
-    )
-    verifications_this_week = week_result.scalar() or 0
-
-    # Get consensus matches (votes that matched final outcome)
-    # This requires checking each vote against the reading's final status
-    consensus_query = await db.execute(
-        select(VerificationVote, Reading.verification_status)
-        .join(Reading, Reading.id == VerificationVote.reading_id)
-        .where(
-            and_(
-                VerificationVote.verifier_id == current_user.id,
-                Reading.verification_status.in_(["verified", "rejected"])
-            )
-        )
-    )
-    consensus_rows = consensus_query.fetchall()
-
-    consensus_matches = 0
-    for row in consensus_rows:
-        vote = row[0]
-        final_status = row[1]
-        if (vote.vote == "correct" and final_status == "verified") or \
-           (vote.vote == "incorrect" and final_status == "rejected"):
-            consensus_matches += 1
+    total_verifications = stats.total
+    verifications_this_week = stats.this_week
+    consensus_matches = stats.matches
 
     consensus_rate = 0.0
-    if len(consensus_rows) > 0:
-        consensus_rate = consensus_matches / len(consensus_rows)
+    if stats.finalized > 0:
+        consensus_rate = consensus_matches / stats.finalized
 
     # XP earned from verifications
     xp_earned = total_verifications * XP_FOR_VERIFICATION + consensus_matches * XP_BONUS_CONSENSUS
@@ -432,38 +453,42 @@ async def get_verification_leaderboard(
     limit: int = Query(20, ge=1, le=100),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get top verifiers leaderboard."""
+    """Get top verifiers leaderboard (cached for a minute; identical for every caller)."""
+
+    cache_key = verification_leaderboard_cache_key(period, limit)
+    cached = await cache_get(cache_key)
+    if cached:
+        return Response(content=cached, media_type="application/json")
 
+    verification_count = func.count(VerificationVote.id).label("verification_count")
     query = (
         select(
             User.id,
             User.display_name,
             User.avatar_emoji,
             User.trust_score,
-            func.count(VerificationVote.id).label("verification_count")
+            verification_count
         )
         .join(VerificationVote, VerificationVote.verifier_id == User.id)
     )
 
     # Filter by period
     if period == "week":
-        week_ago = datetime.now(timezone.utc) - timedelta(days=7)
-        query = query.where(VerificationVote.created_at >= week_ago)
+        query = query.where(VerificationVote.created_at >= _days_ago(7))
     elif period == "month":
-        month_ago = datetime.now(timezone.utc) - timedelta(days=30)
-        query = query.where(VerificationVote.created_at >= month_ago)
+        query = query.where(VerificationVote.created_at >= _days_ago(30))
 
     query = (
         query
         .group_by(User.id, User.display_name, User.avatar_emoji, User.trust_score)
-        .order_by(func.count(VerificationVote.id).desc())
+        .order_by(verification_count.desc())
         .limit(limit)
     )
 
     result = await db.execute(query)
     rows = result.fetchall()
 
-    return [
+    leaderboard = [
         {
             "rank": i + 1,
             "user_id": str(row.id),
@@ -474,42 +499,56 @@ async def get_verification_leaderboard(
         }
         for i, row in enumerate(rows)
     ]
+    await cache_set(cache_key, json.dumps(leaderboard), ttl=LEADERBOARD_TTL_SECONDS)
+
+    return leaderboard
+
+
+def _days_ago(days: int):
+    """SQL now() - interval, so cutoffs use the database clock and no bind parameter"""
+    return func.now() - literal_column(f"interval '{int(days)} days'")
 
 
 async def _check_and_finalize_verification(
-    reading: Reading,
-    db: AsyncSession,
-    current_user: User
+    reading: Row,
+    votes_total: int,
+    db: AsyncSession
 ):
     """
     Check if a reading has enough votes and finalize its verification status.
     Awards bonus XP to users who voted with the consensus.
+    `reading` only needs id, user_id and verification_status.
+    Returns the ids of users whose stats changed.
     """
 
-    # Get all votes for this reading
-    votes_result = await db.execute(
-        select(VerificationVote).where(VerificationVote.reading_id == reading.id)
-    )
-    votes = votes_result.scalars().all()
+    if reading.verification_status != "pending":
+        return []  # Already finalized
 
-    if len(votes) < VOTES_REQUIRED:
-        return  # Not enough votes yet
+    if votes_total < VOTES_REQUIRED:
+        return []  # Not enough votes yet
 
-    # Count votes (weighted by trust score)
-    weighted_correct = 0
-    weighted_incorrect = 0
-    total_weight = 0
+    # Tally votes (weighted by trust score) per vote value in the database
+    tally_result = await db.execute(
+        select(
+            VerificationVote.vote,
+            func.count(),
+            # Missing (or zero) trust scores count as the default of 50
+            func.sum(
+                func.coalesce(func.nullif(VerificationVote.verifier_trust_score, 0), 50)
+            ),
+        )
+        .where(VerificationVote.reading_id == reading.id)
+        .group_by(VerificationVote.vote)
+    )
+    tally = {vote: (count, weight) for vote, count, weight in tally_result.all()}
 
-    for vote in votes:
-        weight = vote.verifier_trust_score or 50  # Default trust score
-        total_weight += weight
-        if vote.vote == "correct":
-            weighted_correct += weight
-        elif vote.vote == "incorrect":
-            weighted_incorrect += weight
+    total_votes = sum(count for count, _ in tally.values())
+    weighted_correct = tally.get("correct", (0, 0))[1]
+    weighted_incorrect = tally.get("incorrect", (0, 0))[1]
+    total_weight = sum(weight for _, weight in tally.values())
 
     if total_weight == 0:
-        return
+        return []
 
     # Determine outcome
     correct_ratio = weighted_correct / total_weight
@@ -524,43 +563,99 @@ async def _check_and_finalize_verification(
     elif incorrect_ratio >= CONSENSUS_THRESHOLD:
         new_status = "rejected"
         winning_vote = "incorrect"
-    elif len(votes) >= VOTES_REQUIRED * 2:
+    elif total_votes >= VOTES_REQUIRED * 2:
         # If we have double the votes and still no consensus, mark as disputed
         new_status = "disputed"
 
     if new_status:
-        reading.verification_status = new_status
-
-        # Calculate verification score
-        reading.verification_score = max(correct_ratio, incorrect_ratio)
-
-        # Get reading owner and update their stats
-        owner_result = await db.execute(
-            select(User).where(User.id == reading.user_id)
+        # Only one concurrent vote gets to finalize (and hand out rewards)
+        finalized = await db.execute(
+            update(Reading)
+            .where(
+                and_(
+                    Reading.id == reading.id,
+                    Reading.verification_status == "pending"
+                )
+            )
+            .values(
+                verification_status=new_status,
+                verification_score=max(correct_ratio, incorrect_ratio)
+            )
+            .execution_options(synchronize_session=False)
         )
-        owner = owner_result.scalar_one_or_none()
-
-        if owner and new_status == "verified":
-            owner.verified_readings += 1
-            owner.xp += 5  # Bonus for verified reading
+        if finalized.rowcount == 0:
+            return []
+
+        # Credit the reading owner
+        if new_status == "verified":
+            await db.execute(
+                update(User)
+                .where(User.id == reading.user_id)
+                .values(
+                    verified_readings=User.verified_readings + 1,
+                    xp=User.xp + 5,  # Bonus for verified reading
+                )
+            )
 
-        # Award bonus XP to voters who matched consensus
+        # Award bonus XP to voters who matched consensus and dock dissenters,
+        # in one UPDATE ... FROM verification_votes (no vote rows are fetched)
+        rewarded_user_ids = [reading.user_id]
         if winning_vote:
-            for vote in votes:
-                if vote.vote == winning_vote:
-                    voter_result = await db.execute(
-                        select(User).where(User.id == vote.verifier_id)
+            matched = VerificationVote.vote == winning_vote
+            voters_result = await db.execute(
+                update(User)
+                .where(
+                    and_(
+                        User.id == VerificationVote.verifier_id,
+                        VerificationVote.reading_id == reading.id,
+                        VerificationVote.vote != "unclear"
                     )
-                    voter = voter_result.scalar_one_or_none()
-                    if voter:
-                        voter.xp += XP_BONUS_CONSENSUS
-                        # Increase trust score for correct votes
-                        voter.trust_score = min(100, voter.trust_score + 1)
-                elif vote.vote != "unclear":
-                    # Decrease trust score for incorrect votes
-                    voter_result = await db.execute(
-                        select(User).where(User.id == vote.verifier_id)
+                )
+                .values(
+                    xp=case((matched, User.xp + XP_BONUS_CONSENSUS), else_=User.xp),
+                    # Trust score goes up for correct votes, down for incorrect ones
+                    trust_score=case(
+                        (matched, func.least(100, User.trust_score + 1)),
+                        else_=func.greatest(0, User.trust_score - 1),
+                    ),
+                )
+                .returning(User.id)
+                .execution_options(synchronize_session=False)
+            )
+            rewarded_user_ids += voters_result.scalars().all()
+
+        return rewarded_user_ids
+
+    return []
+
+
+async def _verification_history_stats(db: AsyncSession, user_id: UUID) -> HistoryStats:
+    """
+    Totals, this week's count and consensus matches in one pass over the
+    user's votes; finalized means the reading was verified or rejected.
+    """
+    week_ago = _days_ago(7)
+    finalized = Reading.verification_status.in_(["verified", "rejected"])
+    stats_result = await db.execute(
+        select(
+            func.count().label("total"),
+            func.count().filter(VerificationVote.created_at >= week_ago).label("this_week"),
+            func.count().filter(finalized).label("finalized"),
+            func.count().filter(
+                or_(
+                    and_(
+                        VerificationVote.vote == "correct",
+                        Reading.verification_status == "verified"
+                    ),
+                    and_(
+                        VerificationVote.vote == "incorrect",
+                        Reading.verification_status == "rejected"
                     )
-                    voter = voter_result.scalar_one_or_none()
-                    if voter:
-                        voter.trust_score = max(0, voter.trust_score - 1)
+                )
+            ).label("matches")
+        )
+        .select_from(VerificationVote)
+        .join(Reading, Reading.id == VerificationVote.reading_id)
+        .where(VerificationVote.verifier_id == user_id)
+    )
+    return HistoryStats(**stats_result.one()._asdict())
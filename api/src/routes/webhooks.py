@@ -5,6 +5,7 @@ Enterprise webhook configuration for receiving real-time notifications
 when events occur in the MeterScience platform.
 """
 
+import json
 import secrets
 import hmac
 import hashlib
@@ -18,9 +19,10 @@ from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 import httpx
 
-from ..database import get_db
+from ..database import get_db, async_session_maker
 from ..models import User, Webhook
 from ..services.auth import get_current_user
+from ..services.http import http_client
 
 router = APIRouter()
 
@@ -37,10 +39,27 @@ VALID_EVENTS = [
     "user.level_up",
     "user.badge_earned",
 ]
+VALID_EVENTS_SET = frozenset(VALID_EVENTS)
 
 # Max webhooks per user
 MAX_WEBHOOKS_PER_USER = 10
 
+# Static payload for GET /events, built once at import
+AVAILABLE_EVENTS_RESPONSE = {
+    "events": [
+        {"name": "reading.created", "description": "New meter reading submitted"},
+        {"name": "reading.verified", "description": "Reading verified by community"},
+        {"name": "reading.rejected", "description": "Reading rejected by community"},
+        {"name": "meter.created", "description": "New meter added"},
+        {"name": "meter.updated", "description": "Meter configuration changed"},
+        {"name": "meter.deleted", "description": "Meter removed"},
+        {"name": "campaign.joined", "description": "User joined a campaign"},
+        {"name": "campaign.completed", "description": "Campaign goal reached"},
+        {"name": "user.level_up", "description": "User reached a new level"},
+        {"name": "user.badge_earned", "description": "User earned a new badge"},
+    ]
+}
+
 
 class WebhookCreate(BaseModel):
     url: HttpUrl
@@ -86,13 +105,9 @@ def generate_webhook_secret() -> str:
     return secrets.token_hex(32)
 
 
-def sign_payload(payload: str, secret: str) -> str:
+def sign_payload(payload: bytes, secret: str) -> str:
     """Sign a payload with HMAC-SHA256."""
-    return hmac.new(
-        secret.encode(),
-        payload.encode(),
-        hashlib.sha256
-    ).hexdigest()
+    return hmac.digest(secret.encode(), payload, hashlib.sha256).hex()
 
 
 @router.post("/", response_model=WebhookResponse, status_code=status.HTTP_201_CREATED)
@@ -122,7 +137,7 @@ async def create_webhook(
     """
 
     # Validate events
-    invalid_events = [e for e in webhook_data.events if e not in VALID_EVENTS]
+    invalid_events = [e for e in webhook_data.events if e not in VALID_EVENTS_SET]
     if invalid_events:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -198,20 +213,7 @@ async def list_webhooks(
 @router.get("/events")
 async def list_available_events():
     """List all available webhook events."""
-    return {
-        "events": [
-            {"name": "reading.created", "description": "New meter reading submitted"},
-            {"name": "reading.verified", "description": "Reading verified by community"},
-            {"name": "reading.rejected", "description": "Reading rejected by community"},
-            {"name": "meter.created", "description": "New meter added"},
-            {"name": "meter.updated", "description": "Meter configuration changed"},
-            {"name": "meter.deleted", "description": "Meter removed"},
-            {"name": "campaign.joined", "description": "User joined a campaign"},
-            {"name": "campaign.completed", "description": "Campaign goal reached"},
-            {"name": "user.level_up", "description": "User reached a new level"},
-            {"name": "user.badge_earned", "description": "User earned a new badge"},
-        ]
-    }
+    return AVAILABLE_EVENTS_RESPONSE
 
 
 @router.get("/{webhook_id}", response_model=WebhookResponse)
@@ -264,7 +266,7 @@ async def update_webhook(
 
     # Validate events if provided
     if webhook_data.events is not None:
-        invalid_events = [e for e in webhook_data.events if e not in VALID_EVENTS]
+        invalid_events = [e for e in webhook_data.events if e not in VALID_EVENTS_SET]
         if invalid_events:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -397,24 +399,23 @@ async def test_webhook(
         }
     }
 
-    import json
-    payload_str = json.dumps(test_payload)
-    signature = sign_payload(payload_str, webhook.secret)
+    # Serialize once: the signed bytes are exactly the bytes sent
+    body = json.dumps(test_payload).encode()
+    signature = sign_payload(body, webhook.secret)
 
     # Send test request
     start_time = datetime.now(timezone.utc)
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                webhook.url,
-                json=test_payload,
-                headers={
-                    "Content-Type": "application/json",
-                    "X-Webhook-Signature": f"sha256={signature}",
-                    "X-Webhook-Event": "test",
-                    "User-Agent": "MeterScience-Webhook/1.0",
-                }
-            )
+        response = await http_client.post(
+            webhook.url,
+            content=body,
+            headers={
+                "Content-Type": "application/json",
+                "X-Webhook-Signature": f"sha256={signature}",
+                "X-Webhook-Event": "test",
+                "User-Agent": "MeterScience-Webhook/1.0",
+            }
+        )
 
         elapsed = (datetime.now(timezone.utc) - start_time).total_seconds() * 1000
 
@@ -443,7 +444,6 @@ async def test_webhook(
 
 # Webhook delivery service (to be called from other parts of the application)
 async def trigger_webhooks(
-    db: AsyncSession,
     user_id: UUID,
     event: str,
     data: dict
@@ -452,8 +452,23 @@ async def trigger_webhooks(
     Trigger all active webhooks for a user that are subscribed to an event.
 
     This function should be called from other routes when events occur.
+    Schedule it with BackgroundTasks (background_tasks.add_task(...)) so the
+    response is sent before any deliveries are attempted; it opens its own
+    session because the request's session is closed by then.
     """
 
+    async with async_session_maker() as db:
+        await _deliver_webhooks(db, user_id, event, data)
+
+
+async def _deliver_webhooks(
+    db: AsyncSession,
+    user_id: UUID,
+    event: str,
+    data: dict
+):
+    """Send the event to each subscribed webhook and record the outcome"""
+
     result = await db.execute(
         select(Webhook).where(
             Webhook.user_id == user_id,
@@ -473,22 +488,21 @@ async def trigger_webhooks(
             "data": data
         }
 
-        import json
-        payload_str = json.dumps(payload)
-        signature = sign_payload(payload_str, webhook.secret)
+        # Serialize once: the signed bytes are exactly the bytes sent
+        body = json.dumps(payload).encode()
+        signature = sign_payload(body, webhook.secret)
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(
-                    webhook.url,
-                    json=payload,
-                    headers={
-                        "Content-Type": "application/json",
-                        "X-Webhook-Signature": f"sha256={signature}",
-                        "X-Webhook-Event": event,
-                        "User-Agent": "MeterScience-Webhook/1.0",
-                    }
-                )
+            response = await http_client.post(
+                webhook.url,
+                content=body,
+                headers={
+                    "Content-Type": "application/json",
+                    "X-Webhook-Signature": f"sha256={signature}",
+                    "X-Webhook-Event": event,
+                    "User-Agent": "MeterScience-Webhook/1.0",
+                }
+            )
 
             webhook.last_triggered_at = datetime.now(timezone.utc)
 
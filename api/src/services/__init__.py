@@ -3,3 +3,8 @@ Services module
 """
 
 from . import auth
+from . import cache
+from . import http
+from . import leaderboard
+from . import materialized_views
+from . import rate_limit
@@ -2,40 +2,61 @@
 Authentication service
 """
 
+import asyncio
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from passlib.context import CryptContext
-from sqlalchemy import select
+from sqlalchemy import select, DateTime
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from ..database import get_db
+from .cache import cache_get, cache_set, user_cache_key, USER_TTL_SECONDS
 
 # Config
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
+# Built once: passing a Key skips python-jose's per-call key construction
+# (and its attempt to parse the secret as a JWK/JSON on every decode)
+SIGNING_KEY = jwk.construct(SECRET_KEY, ALGORITHM)
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 1 week
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so threads parallelize it; a dedicated pool sized
+# to the CPUs keeps login bursts from queueing behind (or starving) the
+# default executor
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 4)))
+password_pool = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
 # Bearer token
 security = HTTPBearer(auto_error=False)
 
 
-def hash_password(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    """Hash a password (bcrypt runs on the password pool, off the event loop)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_pool, pwd_context.hash, password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against hash (on the password pool, off the event loop)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_pool, pwd_context.verify, plain_password, hashed_password
+    )
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -48,13 +69,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(to_encode, SIGNING_KEY, algorithm=ALGORITHM)
 
 
 def verify_token(token: str) -> Optional[str]:
     """Verify JWT token and return user ID"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SIGNING_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
             return None
@@ -63,13 +84,10 @@ def verify_token(token: str) -> Optional[str]:
         return None
 
 
-async def get_current_user(
+async def get_current_user_id(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-):
-    """Get current authenticated user"""
-    from ..models import User
-    
+) -> UUID:
+    """Get the authenticated user's ID from the token, without a DB lookup"""
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -85,8 +103,66 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    return UUID(user_id)
+
+
+# Columns kept in the user cache: only what routes read off the
+# authenticated user. Credentials and contact/billing details (password_hash,
+# email, stripe_customer_id, ...) never go to Redis.
+USER_CACHE_COLUMNS = (
+    "id", "display_name", "avatar_emoji", "level", "xp", "total_readings",
+    "verified_readings", "verifications_performed", "streak_days", "trust_score",
+    "badges", "meters_count", "average_confidence", "subscription_tier",
+    "referral_code", "referred_by_id", "postal_code", "created_at",
+)
+
+
+def _user_to_json(user) -> str:
+    """Serialize the cached subset of a User's columns"""
+    return json.dumps(
+        {key: getattr(user, key) for key in USER_CACHE_COLUMNS},
+        default=str,
+    )
+
+
+def _user_from_json(data: str, db: AsyncSession):
+    """
+    Rebuild a cached User and attach it to the session without a query.
+    Columns outside USER_CACHE_COLUMNS are left unloaded.
+    """
+    from ..models import User
+    
+    values = {key: value for key, value in json.loads(data).items() if key in USER_CACHE_COLUMNS}
+    for key, value in list(values.items()):
+        column_type = User.__table__.columns[key].type
+        if value is None:
+            continue
+        if isinstance(column_type, DateTime):
+            values[key] = datetime.fromisoformat(value)
+        elif isinstance(column_type, PG_UUID):
+            values[key] = UUID(value)
+    
+    user = User(**values)
+    # Mark it as loaded (no pending changes) so writes still flush normally
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+
+async def get_current_user(
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get current authenticated user (read through the Redis user cache)"""
+    from ..models import User
+    
+    cache_key = user_cache_key(user_id)
+    cached = await cache_get(cache_key)
+    if cached:
+        return _user_from_json(cached, db)
+    
     result = await db.execute(
-        select(User).where(User.id == UUID(user_id))
+        select(User).where(User.id == user_id)
     )
     user = result.scalar_one_or_none()
     
@@ -97,6 +173,8 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    await cache_set(cache_key, _user_to_json(user), ttl=USER_TTL_SECONDS)
+    
     return user
 
 
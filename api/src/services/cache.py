@@ -0,0 +1,110 @@
+"""
+Redis cache service
+
+Cache-aside helpers for hot read endpoints. Redis is treated as optional:
+any Redis error is swallowed so requests fall through to the database.
+"""
+
+import os
+from typing import Optional
+from uuid import UUID
+
+import redis.asyncio as redis
+from redis.exceptions import RedisError
+
+# Config
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+DEFAULT_TTL_SECONDS = 300
+
+PLATFORM_STATS_CACHE_KEY = "stats:platform"
+PLATFORM_STATS_TTL_SECONDS = 60
+
+LEADERBOARD_TTL_SECONDS = 60
+
+# Also bounds how stale "this week" counts and other voters' consensus
+# outcomes can be; a user's own vote invalidates their entry
+VERIFICATION_HISTORY_TTL_SECONDS = 60
+
+# Authenticated user rows; every users-table write path invalidates them,
+# the TTL only bounds races between a read-through and an invalidation
+USER_TTL_SECONDS = 60
+
+# Short TTL: counters on the profile (xp, total_readings, ...) change with
+# every reading and aren't invalidated individually
+USER_PROFILE_TTL_SECONDS = 30
+
+redis_client = redis.from_url(REDIS_URL, decode_responses=True)
+
+
+def reading_cache_key(reading_id: UUID) -> str:
+    """Cache key for a single reading"""
+    return f"reading:{reading_id}"
+
+
+def latest_reading_cache_key(meter_id: UUID, user_id: UUID) -> str:
+    """Cache key for a user's latest reading on a meter"""
+    return f"latest_reading:{meter_id}:{user_id}"
+
+
+def user_cache_key(user_id: UUID) -> str:
+    """Cache key for the authenticated user's row"""
+    return f"user:{user_id}"
+
+
+def user_profile_cache_key(user_id: UUID) -> str:
+    """Cache key for a user's GET /users/me payload"""
+    return f"user_profile:{user_id}"
+
+
+def users_leaderboard_cache_key(postal_prefix: Optional[str], limit: int) -> str:
+    """Cache key for a users leaderboard page (global when no prefix)"""
+    return f"leaderboard_page:{postal_prefix or '*'}:{limit}"
+
+
+def verification_leaderboard_cache_key(period: str, limit: int) -> str:
+    """Cache key for a verification leaderboard page"""
+    return f"verification_leaderboard:{period}:{limit}"
+
+
+def verification_history_cache_key(user_id: UUID) -> str:
+    """Cache key for a user's verification history stats"""
+    return f"verification_history:{user_id}"
+
+
+async def cache_get(key: str) -> Optional[str]:
+    """Get a cached value, or None on miss / Redis unavailable"""
+    try:
+        return await redis_client.get(key)
+    except RedisError:
+        return None
+
+
+async def cache_set(key: str, value: str, ttl: int = DEFAULT_TTL_SECONDS) -> None:
+    """Store a value with an expiry"""
+    try:
+        await redis_client.set(key, value, ex=ttl)
+    except RedisError:
+        pass
+
+
+async def cache_delete(*keys: str) -> None:
+    """Invalidate one or more keys"""
+    if not keys:
+        return
+    try:
+        await redis_client.delete(*keys)
+    except RedisError:
+        pass
+
+
+async def invalidate_users(*user_ids: UUID) -> None:
+    """Drop cached rows and profiles for users whose row just changed"""
+    await cache_delete(
+        *(key for user_id in user_ids
+          for key in (user_cache_key(user_id), user_profile_cache_key(user_id)))
+    )
+
+
+async def close() -> None:
+    """Close the Redis connection pool"""
+    await redis_client.aclose()
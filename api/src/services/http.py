@@ -0,0 +1,29 @@
+"""
+Outbound HTTP client
+
+A single shared httpx client for webhook deliveries, so requests to the
+same endpoint reuse keep-alive connections instead of paying for DNS, TCP
+and TLS setup on every call. Closed from the app lifespan.
+"""
+
+import os
+
+import httpx
+
+# Config
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "200"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "100"))
+
+http_client = httpx.AsyncClient(
+    timeout=HTTP_TIMEOUT_SECONDS,
+    limits=httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    ),
+)
+
+
+async def close() -> None:
+    """Close pooled connections"""
+    await http_client.aclose()
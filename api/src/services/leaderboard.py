@@ -0,0 +1,111 @@
+"""
+Reading leaderboard service
+
+Keeps every user's total_readings in a Redis sorted set so rank lookups are
+O(log N) instead of a COUNT(*) over the users table. Users with no readings
+never affect anyone's rank, so they don't need to be in the set.
+
+The set can drift (a failed ZADD, or two writes landing out of order), so
+the ready flag expires and the set is rebuilt from the database; a failed
+write drops the flag at once so rank lookups fall back to SQL.
+"""
+
+import logging
+import os
+from typing import Optional
+from uuid import UUID, uuid4
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import redis_client
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_KEY = "leaderboard:users"
+# Set once the sorted set holds every user with readings
+LEADERBOARD_READY_KEY = "leaderboard:users:ready"
+# Prefix for per-run build keys; the lock keeps processes from rebuilding
+# at the same time
+LEADERBOARD_BUILD_KEY = "leaderboard:users:build"
+LEADERBOARD_LOCK_KEY = "leaderboard:users:lock"
+# Upper bound on a rebuild; the lock expires on its own if a builder dies
+LEADERBOARD_LOCK_SECONDS = int(os.getenv("LEADERBOARD_LOCK_SECONDS", "300"))
+# How long a built set is trusted before it is rebuilt from the database
+LEADERBOARD_REBUILD_SECONDS = int(os.getenv("LEADERBOARD_REBUILD_SECONDS", "900"))
+BACKFILL_BATCH_SIZE = 1000
+
+
+async def record_total_readings(user_id: UUID, total_readings: int) -> None:
+    """Store a user's current reading total"""
+    try:
+        await redis_client.zadd(LEADERBOARD_KEY, {str(user_id): total_readings})
+    except RedisError:
+        # The set no longer matches the database; stop trusting it until
+        # the next rebuild
+        try:
+            await redis_client.delete(LEADERBOARD_READY_KEY)
+        except RedisError:
+            pass
+
+
+async def users_ahead(total_readings: int) -> Optional[int]:
+    """
+    Number of users with strictly more readings (ties share a rank).
+    Returns None if the set isn't backfilled or Redis is unavailable.
+    """
+    try:
+        if not await redis_client.exists(LEADERBOARD_READY_KEY):
+            return None
+        return await redis_client.zcount(LEADERBOARD_KEY, f"({total_readings}", "+inf")
+    except RedisError:
+        return None
+
+
+async def backfill(db: AsyncSession) -> None:
+    """
+    Rebuild the sorted set from every user with readings, unless it is
+    still trusted or another process is already rebuilding it. Run at
+    startup and from the refresh loop.
+    """
+    from ..models import User
+
+    token = str(uuid4())
+    # Build aside and swap in, so stale members (e.g. users back at zero
+    # readings) are dropped and readers never see a partial set
+    build_key = f"{LEADERBOARD_BUILD_KEY}:{token}"
+    try:
+        if await redis_client.exists(LEADERBOARD_READY_KEY):
+            return
+        if not await redis_client.set(
+            LEADERBOARD_LOCK_KEY, token, nx=True, ex=LEADERBOARD_LOCK_SECONDS
+        ):
+            return
+
+        try:
+            result = await db.stream(
+                select(User.id, User.total_readings)
+                .where(User.total_readings > 0)
+                .execution_options(yield_per=BACKFILL_BATCH_SIZE)
+            )
+            built = False
+            async for rows in result.partitions():
+                await redis_client.zadd(
+                    build_key, {str(row.id): row.total_readings for row in rows}
+                )
+                built = True
+            if built:
+                await redis_client.rename(build_key, LEADERBOARD_KEY)
+            else:
+                await redis_client.delete(LEADERBOARD_KEY)
+            await redis_client.set(LEADERBOARD_READY_KEY, 1, ex=LEADERBOARD_REBUILD_SECONDS)
+        finally:
+            # No-op after the rename; drops a partial set if the build failed
+            await redis_client.delete(build_key)
+            # Only release the lock if it hasn't expired and passed to
+            # another builder
+            if await redis_client.get(LEADERBOARD_LOCK_KEY) == token:
+                await redis_client.delete(LEADERBOARD_LOCK_KEY)
+    except RedisError:
+        logger.warning("Leaderboard backfill skipped: Redis unavailable")
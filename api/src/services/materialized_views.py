@@ -0,0 +1,195 @@
+"""
+Materialized view refresh service
+
+Aggregate views are created at startup when missing and refreshed on
+per-view intervals by a background task started from the app lifespan.
+The same loop rebuilds the Redis reading leaderboard when it is no longer
+trusted.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Iterable, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import text
+
+from ..database import engine, async_session_maker
+from . import leaderboard
+from .cache import cache_delete, redis_client, PLATFORM_STATS_CACHE_KEY
+
+logger = logging.getLogger(__name__)
+
+# Config
+REFRESH_INTERVAL_SECONDS = int(os.getenv("MV_REFRESH_INTERVAL_SECONDS", "120"))
+
+# Views to refresh and how often (seconds); each needs a unique index
+# for CONCURRENTLY
+MATERIALIZED_VIEWS = {
+    "mv_platform_stats": REFRESH_INTERVAL_SECONDS,
+    "mv_platform_top_regions": REFRESH_INTERVAL_SECONDS,
+    "mv_reading_daily": int(os.getenv("MV_DAILY_REFRESH_INTERVAL_SECONDS", "900")),
+}
+
+# Advisory lock key serializing view creation across workers starting together
+ENSURE_LOCK_KEY = "mv_ensure"
+
+# View definitions, created at startup so databases initialized before a view
+# existed get it too. Index names are Postgres' defaults for the unnamed
+# indexes earlier init.sql versions created, so IF NOT EXISTS matches them.
+MATERIALIZED_VIEW_DDL = {
+    "mv_platform_stats": [
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS mv_platform_stats AS
+        SELECT
+            1 AS id,
+            (SELECT COUNT(*) FROM users) AS total_users,
+            (SELECT COUNT(*) FROM meters) AS total_meters,
+            -- Sum of the per-user counters rather than a full scan of readings
+            (SELECT COALESCE(SUM(total_readings), 0) FROM users)::bigint AS total_readings,
+            recent.readings_today,
+            recent.readings_this_week,
+            recent.readings_this_month,
+            (SELECT COUNT(*) FROM campaigns
+                WHERE is_active = TRUE AND end_date >= NOW()) AS active_campaigns,
+            -- GROUP BY lets the planner hash instead of sorting for COUNT(DISTINCT)
+            (SELECT COUNT(*) FROM (
+                SELECT country FROM users WHERE country IS NOT NULL GROUP BY country
+            ) countries) AS countries_represented,
+            NOW() AS refreshed_at
+        FROM (
+            -- One index range scan for all three periods
+            SELECT
+                COUNT(*) FILTER (WHERE captured_at >= date_trunc('day', NOW() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC') AS readings_today,
+                COUNT(*) FILTER (WHERE captured_at >= NOW() - INTERVAL '7 days') AS readings_this_week,
+                COUNT(*) FILTER (WHERE captured_at >= date_trunc('month', NOW() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC') AS readings_this_month
+            FROM readings
+            WHERE captured_at >= LEAST(
+                date_trunc('month', NOW() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+                NOW() - INTERVAL '7 days'
+            )
+        ) recent
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS mv_platform_stats_id_idx "
+        "ON mv_platform_stats(id)",
+    ],
+    "mv_platform_top_regions": [
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS mv_platform_top_regions AS
+        SELECT
+            LEFT(m.postal_code, 3) AS region,
+            COUNT(r.id) AS reading_count
+        FROM meters m
+        JOIN readings r ON r.meter_id = m.id
+        WHERE m.postal_code IS NOT NULL
+        GROUP BY LEFT(m.postal_code, 3)
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS mv_platform_top_regions_region_idx "
+        "ON mv_platform_top_regions(region)",
+        "CREATE INDEX IF NOT EXISTS mv_platform_top_regions_reading_count_idx "
+        "ON mv_platform_top_regions(reading_count DESC)",
+    ],
+    # Daily per-meter usage rollup for trends, meter stats and comparisons
+    # (UTC days). meter_type is carried along so platform comparisons don't
+    # join meters.
+    "mv_reading_daily": [
+        """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS mv_reading_daily AS
+        SELECT
+            r.meter_id,
+            m.meter_type,
+            (r.captured_at AT TIME ZONE 'UTC')::date AS day,
+            SUM(r.usage_since_last) FILTER (WHERE r.usage_since_last > 0) AS usage,
+            COUNT(*) FILTER (WHERE r.usage_since_last > 0) AS usage_readings
+        FROM readings r
+        JOIN meters m ON m.id = r.meter_id
+        WHERE r.usage_since_last IS NOT NULL
+        GROUP BY r.meter_id, m.meter_type, (r.captured_at AT TIME ZONE 'UTC')::date
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS mv_reading_daily_meter_id_day_idx "
+        "ON mv_reading_daily(meter_id, day)",
+        "CREATE INDEX IF NOT EXISTS mv_reading_daily_meter_type_day_meter_id_usage_idx "
+        "ON mv_reading_daily(meter_type, day) INCLUDE (meter_id, usage)",
+    ],
+}
+
+
+def refresh_lock_key(view: str) -> str:
+    """Advisory lock / Redis claim key for refreshing a view"""
+    return f"mv_refresh:{view}"
+
+
+async def ensure_materialized_views() -> None:
+    """Create any missing views and their indexes (idempotent)"""
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": ENSURE_LOCK_KEY}
+        )
+        for statements in MATERIALIZED_VIEW_DDL.values():
+            for statement in statements:
+                await conn.execute(text(statement))
+
+
+async def refresh_materialized_views(views: Optional[Iterable[str]] = None) -> None:
+    """
+    Refresh the given views (default: all) without blocking readers
+
+    A view another process is already refreshing is skipped rather than
+    queued behind it.
+    """
+    for view in views or MATERIALIZED_VIEWS:
+        async with engine.begin() as conn:
+            locked = await conn.scalar(
+                text("SELECT pg_try_advisory_xact_lock(hashtext(:key))"),
+                {"key": refresh_lock_key(view)},
+            )
+            if not locked:
+                continue
+            await conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+    await cache_delete(PLATFORM_STATS_CACHE_KEY)
+
+
+async def _claim_refresh(view: str, interval: int) -> bool:
+    """Claim this interval's refresh of a view across processes"""
+    try:
+        return bool(await redis_client.set(refresh_lock_key(view), 1, nx=True, ex=interval))
+    except RedisError:
+        # Without Redis every process refreshes on its own schedule; the
+        # advisory lock still keeps them from running concurrently
+        return True
+
+
+async def refresh_loop() -> None:
+    """Refresh each view on its own interval; errors are logged and retried"""
+    tick = min(MATERIALIZED_VIEWS.values())
+    # Views are created populated at startup, so the first refresh waits a
+    # full interval instead of every worker refreshing everything on boot
+    started = time.monotonic()
+    last_refreshed = {view: started for view in MATERIALIZED_VIEWS}
+    while True:
+        now = time.monotonic()
+        due = [
+            view for view, interval in MATERIALIZED_VIEWS.items()
+            if now - last_refreshed[view] >= interval
+        ]
+        for view in due:
+            # Another process claimed this interval; retry each tick until
+            # its claim expires
+            if not await _claim_refresh(view, MATERIALIZED_VIEWS[view]):
+                continue
+            try:
+                await refresh_materialized_views([view])
+                last_refreshed[view] = now
+            except Exception:
+                logger.exception("Materialized view refresh failed: %s", view)
+                # Release the claim so the next tick (here or elsewhere) retries
+                await cache_delete(refresh_lock_key(view))
+        # Rebuild the rank sorted set once its ready flag expires or is dropped
+        try:
+            async with async_session_maker() as session:
+                await leaderboard.backfill(session)
+        except Exception:
+            logger.exception("Leaderboard rebuild failed")
+        await asyncio.sleep(tick)
@@ -0,0 +1,40 @@
+"""
+Rate limiting service
+
+Fixed-window request counters in Redis for unauthenticated endpoints that
+do expensive work (bcrypt, inserts). Like the cache, limits fail open: if
+Redis is unavailable requests are let through.
+"""
+
+from fastapi import HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from .cache import redis_client
+
+
+def rate_limit(name: str, limit: int, window_seconds: int):
+    """
+    Dependency allowing `limit` requests per client IP every `window_seconds`.
+
+    Usage: @router.post("/login", dependencies=[Depends(rate_limit("login", 10, 60))])
+    """
+
+    async def dependency(request: Request) -> None:
+        client_ip = request.client.host if request.client else "unknown"
+        key = f"rate_limit:{name}:{client_ip}"
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.incr(key)
+                pipe.expire(key, window_seconds, nx=True)
+                count, _ = await pipe.execute()
+        except RedisError:
+            return
+
+        if count > limit:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(window_seconds)},
+            )
+
+    return dependency
@@ -25,6 +25,10 @@ CREATE TABLE users (
     trust_score INTEGER DEFAULT 50,
     badges JSONB DEFAULT '[]',
     
+    -- Denormalized stats
+    meters_count INTEGER DEFAULT 0,
+    average_confidence FLOAT DEFAULT 0,
+    
     -- Subscription
     subscription_tier VARCHAR(20) DEFAULT 'free',
     subscription_expires_at TIMESTAMPTZ,
@@ -120,6 +124,10 @@ CREATE TABLE readings (
     -- Verification
     verification_status VARCHAR(20) DEFAULT 'pending',
     verification_score FLOAT,
+    votes_total INTEGER DEFAULT 0,
+    votes_correct INTEGER DEFAULT 0,
+    votes_incorrect INTEGER DEFAULT 0,
+    votes_unclear INTEGER DEFAULT 0,
     flagged_for_review BOOLEAN DEFAULT FALSE,
     flag_reason TEXT,
     
@@ -271,14 +279,29 @@ CREATE INDEX idx_readings_user_id ON readings(user_id);
 CREATE INDEX idx_readings_captured_at ON readings(captured_at DESC);
 CREATE INDEX idx_readings_verification_status ON readings(verification_status);
 CREATE INDEX idx_readings_flagged ON readings(flagged_for_review) WHERE flagged_for_review = TRUE;
+CREATE INDEX idx_readings_user_time ON readings(user_id, captured_at DESC) INCLUDE (confidence);
+CREATE INDEX idx_readings_meter_time_usage ON readings(meter_id, captured_at DESC)
+    INCLUDE (usage_since_last) WHERE usage_since_last > 0;
+
+CREATE INDEX idx_readings_pending_queue ON readings(votes_total DESC, confidence DESC, id DESC)
+    WHERE verification_status = 'pending';
+
+CREATE INDEX idx_verification_votes_verifier_created ON verification_votes(verifier_id, created_at DESC)
+    INCLUDE (reading_id, vote);
+CREATE INDEX idx_verification_votes_reading_vote ON verification_votes(reading_id, vote)
+    INCLUDE (verifier_trust_score);
 
 CREATE INDEX idx_meters_user_id ON meters(user_id);
 CREATE INDEX idx_meters_location ON meters USING GIST(location);
 CREATE INDEX idx_meters_postal_code ON meters(postal_code);
+CREATE INDEX idx_meters_postal_type ON meters(postal_code text_pattern_ops, meter_type);
 
-CREATE INDEX idx_users_referral_code ON users(referral_code);
 CREATE INDEX idx_users_location ON users USING GIST(location);
 CREATE INDEX idx_users_postal_code ON users(postal_code);
+CREATE INDEX idx_users_total_readings ON users(total_readings DESC, id DESC)
+    INCLUDE (display_name, avatar_emoji, level, streak_days, trust_score);
+CREATE INDEX idx_users_postal3_readings ON users(LEFT(postal_code, 3), total_readings DESC, id DESC)
+    INCLUDE (display_name, avatar_emoji, level, streak_days, trust_score);
 
 CREATE INDEX idx_campaigns_location ON campaigns USING GIST(center_location);
 CREATE INDEX idx_campaigns_active ON campaigns(is_active, is_public, end_date);
@@ -327,6 +350,10 @@ HAVING COUNT(DISTINCT m.user_id) >= 5; -- Privacy threshold
 
 CREATE UNIQUE INDEX ON neighbor_stats(postal_prefix, meter_type);
 
+-- Aggregate materialized views (mv_platform_stats, mv_platform_top_regions,
+-- mv_reading_daily) are created and refreshed by the API; see
+-- api/src/services/materialized_views.py
+
 -- Grant permissions
 GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA public TO postgres;
 GRANT ALL PRIVILEGES ON ALL SEQUENCES IN SCHEMA public TO postgres;
@@ -0,0 +1,56 @@
+-- MeterScience schema upgrade for existing databases
+--
+-- init.sql only runs on an empty data directory and the API's create_all
+-- never alters existing tables, so databases created before these columns
+-- existed need this script. It is idempotent and safe to re-run; the
+-- backfills recompute every counter from the source tables.
+--
+--   psql "$DATABASE_URL" -f docker/upgrade.sql
+
+BEGIN;
+
+-- Denormalized per-user stats
+ALTER TABLE users ADD COLUMN IF NOT EXISTS meters_count INTEGER DEFAULT 0;
+ALTER TABLE users ADD COLUMN IF NOT EXISTS average_confidence FLOAT DEFAULT 0;
+
+-- total_readings is treated as exact (reading list paging, ranks,
+-- incremental average_confidence) but older builds didn't count hardware
+-- readings, so it is recomputed alongside the new columns
+UPDATE users u SET
+    meters_count = (SELECT COUNT(*) FROM meters m WHERE m.user_id = u.id),
+    total_readings = COALESCE(r.readings, 0),
+    average_confidence = COALESCE(r.average_confidence, 0)
+FROM users u2
+LEFT JOIN (
+    SELECT user_id, COUNT(*) AS readings, AVG(confidence) AS average_confidence
+    FROM readings
+    GROUP BY user_id
+) r ON r.user_id = u2.id
+WHERE u2.id = u.id;
+
+-- Denormalized per-reading vote tallies. The queue, status endpoint and
+-- finalization trust these, so readings that already have votes must not
+-- start from zero
+ALTER TABLE readings ADD COLUMN IF NOT EXISTS votes_total INTEGER DEFAULT 0;
+ALTER TABLE readings ADD COLUMN IF NOT EXISTS votes_correct INTEGER DEFAULT 0;
+ALTER TABLE readings ADD COLUMN IF NOT EXISTS votes_incorrect INTEGER DEFAULT 0;
+ALTER TABLE readings ADD COLUMN IF NOT EXISTS votes_unclear INTEGER DEFAULT 0;
+
+UPDATE readings r SET
+    votes_total = v.votes_total,
+    votes_correct = v.votes_correct,
+    votes_incorrect = v.votes_incorrect,
+    votes_unclear = v.votes_unclear
+FROM (
+    SELECT
+        reading_id,
+        COUNT(*) AS votes_total,
+        COUNT(*) FILTER (WHERE vote = 'correct') AS votes_correct,
+        COUNT(*) FILTER (WHERE vote = 'incorrect') AS votes_incorrect,
+        COUNT(*) FILTER (WHERE vote = 'unclear') AS votes_unclear
+    FROM verification_votes
+    GROUP BY reading_id
+) v
+WHERE v.reading_id = r.id;
+
+COMMIT;